@@ -0,0 +1,119 @@
+from projection import get_path, item_matcher
+from resource_index import item_namespace
+from streaming_json import ItemStream
+
+# Atalhos aceitos em groupBy
+GROUP_ALIASES = {
+    "namespace": None,
+    "phase": "status.phase",
+    "node": "spec.nodeName",
+    "type": "spec.type",
+}
+
+METRICS = ("count", "readiness")
+
+DEFAULT_TOP_N = 10
+
+
+def group_value(item, field):
+    if field == "namespace":
+        return item_namespace(item)
+    value = get_path(item, GROUP_ALIASES.get(field) or field)
+    if isinstance(value, (dict, list)):
+        return None
+    return value
+
+
+def readiness(item):
+    """(prontos, desejados) de um item: réplicas de deployments ou a condição Ready de pods."""
+    replicas = get_path(item, "spec.replicas")
+    if replicas is not None:
+        return get_path(item, "status.readyReplicas") or 0, replicas
+    for condition in get_path(item, "status.conditions") or []:
+        if isinstance(condition, dict) and condition.get("type") == "Ready":
+            return (1 if condition.get("status") == "True" else 0), 1
+    return 0, 1
+
+
+def _ratio(ready, desired):
+    return round(ready / desired, 3) if desired else 1.0
+
+
+def aggregate(items, group_by=None, metric="count", top_n=DEFAULT_TOP_N):
+    """Agrupa os itens e retorna contagens (e prontidão) por grupo, só com os N maiores grupos.
+
+    Com `metric="readiness"`, cada grupo traz réplicas prontas/desejadas e o
+    resultado inclui os N itens menos prontos. Os itens são percorridos uma
+    única vez, e podem vir de um ItemStream.
+    """
+    if isinstance(group_by, str):
+        group_by = [field.strip() for field in group_by.split(",") if field.strip()]
+    group_by = group_by or []
+    top_n = max(1, int(top_n or DEFAULT_TOP_N))
+
+    groups = {}
+    not_ready = []
+    total = 0
+    for item in items:
+        total += 1
+        key = tuple(group_value(item, field) for field in group_by)
+        group = groups.setdefault(key, {"count": 0, "ready": 0, "desired": 0})
+        group["count"] += 1
+        if metric == "readiness":
+            ready, desired = readiness(item)
+            group["ready"] += ready
+            group["desired"] += desired
+            if ready < desired:
+                not_ready.append({
+                    "namespace": item_namespace(item),
+                    "name": get_path(item, "metadata.name"),
+                    "ready": ready,
+                    "desired": desired,
+                    "ratio": _ratio(ready, desired),
+                })
+
+    ordered = sorted(groups.items(), key=lambda pair: (-pair[1]["count"], [str(v) for v in pair[0]]))
+    result_groups = []
+    for key, group in ordered[:top_n]:
+        entry = {"key": dict(zip(group_by, key)), "count": group["count"]}
+        if metric == "readiness":
+            entry.update(ready=group["ready"], desired=group["desired"], ratio=_ratio(group["ready"], group["desired"]))
+        result_groups.append(entry)
+
+    result = {"total": total, "groupBy": group_by, "groups": result_groups}
+    if len(ordered) > top_n:
+        result["otherGroups"] = len(ordered) - top_n
+        result["otherCount"] = sum(group["count"] for _, group in ordered[top_n:])
+    if metric == "readiness":
+        result["notReady"] = len(not_ready)
+        result["leastReady"] = sorted(not_ready, key=lambda entry: (entry["ratio"], entry["namespace"], entry["name"]))[:top_n]
+    return result
+
+
+def aggregate_response(resource_type, response, group_by=None, metric="count", top_n=DEFAULT_TOP_N,
+                       label_selector=None, field_selector=None):
+    """Agrega uma resposta de tools/get (do MCP Server, do cache, do informer ou lida em streaming)."""
+    streamed = isinstance(response, ItemStream)
+    if not streamed and (not isinstance(response, dict) or not isinstance(response.get("items"), list)):
+        return response
+    error = None
+    if metric not in METRICS:
+        error = f"Métrica inválida: {metric} (use {', '.join(METRICS)})"
+    else:
+        try:
+            top_n = int(top_n or DEFAULT_TOP_N)
+        except (TypeError, ValueError):
+            error = f"topN inválido: {top_n!r} (use um número de grupos)"
+    if error:
+        if streamed:
+            response.close()
+        return {"error": error}
+    items = response if streamed else response["items"]
+    matches = item_matcher(label_selector, field_selector)
+    if matches is not None:
+        items = (item for item in items if matches(item))
+    result = aggregate(items, group_by, metric, top_n)
+    if streamed and not response.found:
+        return response.extra
+    result["resourceType"] = resource_type
+    return result
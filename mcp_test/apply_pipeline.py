@@ -0,0 +1,114 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from manifests import WORKLOAD_KINDS, apply_tier, dump_manifest, manifest_key, object_key, parse_manifests, resource_type_for_kind
+from resource_index import CLUSTER_SCOPED_TYPES
+
+# Número máximo de objetos aplicados em paralelo dentro de uma mesma camada
+MAX_APPLY_WORKERS = int(os.getenv("MCP_APPLY_CONCURRENCY", "8"))
+
+
+def response_succeeded(response):
+    """Indica se uma resposta de tools/apply representa sucesso."""
+    return (
+        isinstance(response, dict)
+        and "error" not in response
+        and response.get("status") != "error"
+    )
+
+
+def unchanged_response(obj):
+    """Resposta de um apply idêntico ao último registrado (não enviado ao MCP Server)."""
+    kind, namespace, name = manifest_key(obj)
+    return {
+        "status": "unchanged",
+        "message": f"{kind} '{name}' já está aplicado com esta configuração (nenhuma alteração)",
+        "resource": {"kind": kind, "namespace": namespace, "name": name}
+    }
+
+
+def affected_resources(config):
+    """Pares (resourceType, namespace) cujos dados locais um apply bem-sucedido invalida.
+
+    Workloads também afetam os pods do namespace; tipos sem namespace vêm com
+    namespace None (todas as chaves).
+    """
+    kind, namespace, _ = object_key(config)
+    affected = [resource_type_for_kind(kind)]
+    if kind in WORKLOAD_KINDS:
+        affected.append("pods")
+    return [
+        (resource_type, None if resource_type in CLUSTER_SCOPED_TYPES else namespace)
+        for resource_type in affected
+    ]
+
+
+def tiers_of(objects):
+    """Agrupa os objetos em camadas de dependência, como listas de (posição, objeto)."""
+    tiers = {}
+    for position, obj in enumerate(objects):
+        tiers.setdefault(apply_tier(obj.get("kind")), []).append((position, obj))
+    return [tiers[tier] for tier in sorted(tiers)]
+
+
+def object_result(obj, response):
+    kind, namespace, name = manifest_key(obj)
+    if isinstance(response, dict) and response.get("status") == "unchanged":
+        status = "unchanged"
+    else:
+        status = "success" if response_succeeded(response) else "error"
+    return {
+        "kind": kind,
+        "namespace": namespace,
+        "name": name,
+        "status": status,
+        "response": response,
+    }
+
+
+def aggregate_results(results):
+    """Resposta única para a aplicação de vários objetos."""
+    failed = sum(1 for result in results if result["status"] == "error")
+    if failed == 0:
+        status = "success"
+    elif failed == len(results):
+        status = "error"
+    else:
+        status = "partial"
+
+    return {
+        "status": status,
+        "message": f"{len(results) - failed} de {len(results)} objetos aplicados com sucesso",
+        "results": results,
+    }
+
+
+def apply_manifests(config, apply_fn, max_workers=None):
+    """Aplica um YAML/JSON com um ou vários objetos.
+
+    `apply_fn(config)` aplica um único objeto e retorna a resposta do MCP Server.
+    Os objetos são ordenados por dependência (Namespaces e CRDs antes de
+    ConfigMaps, que vêm antes de Deployments...) e os objetos de uma mesma
+    camada são aplicados em paralelo. Com um único objeto (ou conteúdo que não
+    pode ser interpretado) a configuração é enviada sem alterações.
+    """
+    try:
+        objects = parse_manifests(config)
+    except ValueError:
+        objects = []
+    if len(objects) <= 1:
+        return apply_fn(config)
+
+    results = [None] * len(objects)
+
+    def apply_one(pair):
+        position, obj = pair
+        results[position] = object_result(obj, apply_fn(dump_manifest(obj)))
+
+    workers = max(1, max_workers or MAX_APPLY_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Cada camada só começa depois que a anterior terminou
+        for tier in tiers_of(objects):
+            list(executor.map(apply_one, tier))
+
+    return aggregate_results(results)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+from startup import LazyModule
+
+openai = LazyModule("openai")
+
+# Arquivo local com os IDs dos assistants já criados
+REGISTRY_PATH = os.getenv(
+    "ASSISTANT_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".assistant_registry.json")
+)
+
+
+def definition_hash(instructions, tools, model):
+    """Hash estável da definição do assistant (instruções + ferramentas + modelo)."""
+    definition = json.dumps(
+        {"instructions": instructions, "tools": tools, "model": model},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+def load_registry(path=REGISTRY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_registry(registry, path=REGISTRY_PATH):
+    # Escrever em um arquivo temporário e renomear, para não corromper o registro
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def get_or_create_assistant(name, instructions, tools, model, path=REGISTRY_PATH):
+    """Retorna o ID de um assistant com a definição informada.
+
+    Reutiliza o assistant registrado com o mesmo nome; se a definição mudou,
+    ele é atualizado em vez de recriado. Um novo assistant só é criado quando
+    não há registro (ou o assistant registrado não existe mais).
+    """
+    registry = load_registry(path)
+    entry = registry.get(name)
+    digest = definition_hash(instructions, tools, model)
+
+    if entry and entry.get("hash") == digest:
+        return entry["id"]
+
+    assistant_id = None
+    if entry:
+        try:
+            assistant_id = openai.beta.assistants.update(
+                entry["id"],
+                instructions=instructions,
+                tools=tools,
+                model=model
+            ).id
+            print(f"Assistant '{name}' atualizado (definição alterada)")
+        except openai.NotFoundError:
+            print(f"Assistant registrado '{entry['id']}' não existe mais, criando um novo...")
+
+    if assistant_id is None:
+        assistant_id = openai.beta.assistants.create(
+            name=name,
+            instructions=instructions,
+            tools=tools,
+            model=model
+        ).id
+
+    registry[name] = {"id": assistant_id, "hash": digest}
+    save_registry(registry, path)
+    return assistant_id
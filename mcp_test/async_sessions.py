@@ -0,0 +1,309 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import httpx
+import openai
+
+import projection
+from aggregation import aggregate_response
+from apply_pipeline import (affected_resources, aggregate_results, object_result, response_succeeded,
+                            tiers_of, unchanged_response)
+from circuit_breaker import CircuitBreaker
+from k8s_assistant import MCP_SERVER_URL, OUTPUT_FORMAT, POLL_MAX_INTERVAL, POLL_MIN_INTERVAL, reads_resources
+from simulation import is_simulated, simulated_response
+from manifest_store import ManifestStore
+from mcp_queue import AsyncRequestQueue, BackpressureError
+from manifests import dump_manifest, manifest_key, object_key, parse_manifests
+from resource_cache import ResourceCache
+from single_flight import COALESCED_ENDPOINTS, AsyncSingleFlight, request_key
+from tool_dispatcher import async_object_lock, dispatch_tool_calls_async
+import table_encoding
+
+# Número máximo de sessões atendidas ao mesmo tempo
+MAX_SESSIONS = int(os.getenv("ASSISTANT_MAX_SESSIONS", "16"))
+
+
+class SessionState:
+    """Estado de uma conversa: thread da OpenAI, simulação forçada e histórico."""
+
+    def __init__(self, session_id, thread_id, use_simulation=False):
+        self.session_id = session_id
+        self.thread_id = thread_id
+        self.use_simulation = use_simulation
+        self.turns = []
+
+    def add_turn(self, prompt, answer, latency):
+        self.turns.append({"prompt": prompt, "answer": answer, "latency": latency})
+
+
+class AsyncMCPClient:
+    """Cliente assíncrono do MCP Server com pool de conexões compartilhado."""
+
+    def __init__(self, base_url=MCP_SERVER_URL, pool_size=None, timeout=None):
+        pool_size = pool_size or int(os.getenv("MCP_POOL_SIZE", "10"))
+        timeout = timeout or httpx.Timeout(
+            float(os.getenv("MCP_TIMEOUT", "10")),
+            connect=float(os.getenv("MCP_CONNECT_TIMEOUT", "2"))
+        )
+        self.http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        # Sessões diferentes pedindo a mesma consulta ao mesmo tempo compartilham a requisição
+        self.flights = AsyncSingleFlight("async_mcp")
+        # Mesma fila com prioridade, limite de taxa e backpressure do modo interativo
+        self.queue = AsyncRequestQueue() if os.getenv("MCP_QUEUE_ENABLED", "1") == "1" else None
+        # Um circuit breaker por endpoint: com falhas seguidas, as sessões usam a simulação
+        self.breakers = {}
+
+    def breaker(self, endpoint):
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(f"async:{endpoint}")
+        return self.breakers[endpoint]
+
+    async def call(self, session, endpoint, payload):
+        """Equivalente assíncrono de call_mcp_server (simulação forçada ou, por chamada, como fallback)."""
+        if session.use_simulation:
+            return simulated_response(endpoint, payload)
+        if endpoint in COALESCED_ENDPOINTS:
+            return await self.flights.do(request_key(endpoint, payload),
+                                         lambda: self._post(session, endpoint, payload), tag=payload)
+        return await self._post(session, endpoint, payload)
+
+    async def _post(self, session, endpoint, payload):
+        if self.queue is None:
+            return await self._send(session, endpoint, payload)
+        try:
+            return await self.queue.run(endpoint, lambda: self._send(session, endpoint, payload))
+        except BackpressureError as e:
+            return {
+                "error": f"{e}. Aguarde e tente novamente; prefira aplicar várias alterações em um único manifesto.",
+                "backpressure": True,
+                "retryAfter": e.retry_after
+            }
+
+    async def _send(self, session, endpoint, payload):
+        # O breaker é consultado já dentro da fila: uma chamada de teste (half-open)
+        # liberada aqui sempre termina em record_success ou record_failure
+        breaker = self.breaker(endpoint)
+        if not breaker.allow_request():
+            return simulated_response(endpoint, payload)
+        try:
+            response = await self.http.post(f"/v1/{endpoint}", json=payload)
+        except httpx.HTTPError as e:
+            breaker.record_failure()
+            print(f"[{session.session_id}] Exceção ao chamar o MCP Server: {e}; usando simulação")
+            return simulated_response(endpoint, payload)
+        except BaseException:
+            # Cancelamento (ou erro fora do HTTP) não diz nada sobre o servidor
+            breaker.release()
+            raise
+        # Erros 5xx indicam degradação do servidor; 4xx são erros da requisição
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if response.status_code == 200:
+            return response.json()
+        return {"error": f"Erro na chamada do MCP Server: {response.status_code}"}
+
+    async def close(self):
+        await self.http.aclose()
+
+
+class AsyncSessionEngine:
+    """Atende várias conversas concorrentes em um único processo (asyncio).
+
+    Cada sessão tem sua própria thread da OpenAI; o cliente HTTP do MCP
+    Server, o cache de recursos e o registro de manifestos aplicados são
+    compartilhados entre as sessões. As chamadas de ferramenta seguem as
+    mesmas regras do modo interativo (erro por chamada, lock por objeto,
+    applies sem alteração ignorados, simulação como fallback por chamada),
+    mas não geram spans: o tracer de instrumentation é por thread.
+    """
+
+    def __init__(self, assistant_id, mcp_url=MCP_SERVER_URL, max_sessions=MAX_SESSIONS,
+                 openai_client=None, force_simulation=False, manifest_store=None):
+        self.assistant_id = assistant_id
+        self.client = openai_client or openai.AsyncOpenAI()
+        self.mcp = AsyncMCPClient(mcp_url)
+        self.cache = ResourceCache()
+        # Em memória por padrão, para não se misturar ao registro do chat interativo
+        if manifest_store is None and os.getenv("MCP_SKIP_UNCHANGED", "1") == "1":
+            manifest_store = ManifestStore(path="")
+        self.manifest_store = manifest_store
+        self.force_simulation = force_simulation
+        self._slots = asyncio.Semaphore(max_sessions)
+
+    async def open_session(self, session_id=None):
+        # Sem simulação forçada, cada chamada decide pelo circuit breaker do endpoint
+        thread = await self.client.beta.threads.create()
+        return SessionState(session_id or uuid.uuid4().hex[:8], thread.id, self.force_simulation)
+
+    async def _fetch_resources(self, session, resource_type, namespace):
+        response = self.cache.get(resource_type, namespace)
+        if response is None:
+            generation = self.cache.generation(resource_type, namespace)
+            response = await self.mcp.call(session, "tools/get", {
+                "resourceType": resource_type,
+                "namespace": namespace
+            })
+            # Respostas de erro e simuladas não são armazenadas
+            if isinstance(response, dict) and "error" not in response and not is_simulated(response):
+                self.cache.put(resource_type, namespace, response, generation)
+        return response
+
+    async def _get_resources(self, session, args):
+        resource_type = args.get("resourceType")
+        response = await self._fetch_resources(session, resource_type, args.get("namespace", "default"))
+        response, _ = projection.project_response(
+            resource_type,
+            response,
+            label_selector=args.get("labelSelector"),
+            field_selector=args.get("fieldSelector"),
+            fields=args.get("fields"),
+            offset=args.get("offset", 0)
+        )
+        return response
+
+    async def _apply_one(self, session, config, force=False):
+        try:
+            objects = parse_manifests(config)
+        except ValueError:
+            objects = []
+        obj = objects[0] if len(objects) == 1 else None
+
+        # Applies no mesmo objeto (de sessões diferentes, inclusive) não correm em paralelo
+        async with async_object_lock(manifest_key(obj) if obj is not None else object_key(config)):
+            return await self._apply_locked(session, config, obj, force)
+
+    async def _apply_locked(self, session, config, obj, force):
+        changes = None
+        if obj is not None and self.manifest_store is not None:
+            unchanged, changes = self.manifest_store.check(obj)
+            if unchanged and not force:
+                return unchanged_response(obj)
+
+        response = await self.mcp.call(session, "tools/apply", {"config": config})
+        if response_succeeded(response):
+            # Um apply simulado não chegou ao cluster: o objeto não é registrado como aplicado
+            if obj is not None and self.manifest_store is not None and not is_simulated(response):
+                self.manifest_store.record(obj)
+                if changes:
+                    response = dict(response, changes=changes)
+            for resource_type, scope in affected_resources(config):
+                self.cache.invalidate(resource_type, scope)
+                # Consultas de outras sessões iniciadas antes do apply não são reaproveitadas
+                self.mcp.flights.forget(lambda payload: reads_resources(payload, resource_type, scope))
+        return response
+
+    async def _apply(self, session, config, force=False):
+        # Mesma ordenação por camadas de apply_pipeline.apply_manifests
+        try:
+            objects = parse_manifests(config)
+        except ValueError:
+            objects = []
+        if len(objects) <= 1:
+            return await self._apply_one(session, config, force)
+
+        results = [None] * len(objects)
+        for tier in tiers_of(objects):
+            responses = await asyncio.gather(*[
+                self._apply_one(session, dump_manifest(obj), force) for _, obj in tier
+            ])
+            for (position, obj), response in zip(tier, responses):
+                results[position] = object_result(obj, response)
+        return aggregate_results(results)
+
+    async def _execute_tool_call(self, session, function_name, args):
+        result = ""
+        if function_name == "getKubernetesResources":
+            output_format = args.get("outputFormat") or OUTPUT_FORMAT
+            if output_format not in table_encoding.OUTPUT_FORMATS:
+                output_format = "json"
+            result = table_encoding.dumps(await self._get_resources(session, args), output_format)
+        elif function_name == "aggregateKubernetesResources":
+            resource_type = args.get("resourceType")
+            response = await self._fetch_resources(session, resource_type, args.get("namespace", "all"))
+            result = json.dumps(aggregate_response(
+                resource_type,
+                response,
+                group_by=args.get("groupBy"),
+                metric=args.get("metric", "count"),
+                top_n=args.get("topN"),
+                label_selector=args.get("labelSelector"),
+                field_selector=args.get("fieldSelector")
+            ))
+        elif function_name == "applyKubernetesConfig":
+            result = json.dumps(await self._apply(session, args.get("config"), force=args.get("force", False)))
+        return result
+
+    async def send(self, session, prompt):
+        """Executa um turno da sessão e retorna o texto da resposta."""
+        start = time.perf_counter()
+        threads = self.client.beta.threads
+
+        await threads.messages.create(thread_id=session.thread_id, role="user", content=prompt)
+        run = await threads.runs.create(thread_id=session.thread_id, assistant_id=self.assistant_id)
+
+        answer = ""
+        delay = POLL_MIN_INTERVAL
+        while True:
+            run = await threads.runs.retrieve(thread_id=session.thread_id, run_id=run.id)
+
+            if run.status == "completed":
+                messages = await threads.messages.list(thread_id=session.thread_id, run_id=run.id, order="asc")
+                answer = "\n".join(
+                    part.text.value
+                    for message in messages.data if message.role == "assistant"
+                    for part in message.content if part.type == "text"
+                )
+                break
+
+            elif run.status == "requires_action":
+                # As chamadas de ferramenta de um passo são executadas em paralelo;
+                # uma chamada com erro vira uma saída de erro sem derrubar as demais
+                tool_outputs = await dispatch_tool_calls_async(
+                    run.required_action.submit_tool_outputs.tool_calls,
+                    lambda function_name, args: self._execute_tool_call(session, function_name, args)
+                )
+                await threads.runs.submit_tool_outputs(
+                    thread_id=session.thread_id,
+                    run_id=run.id,
+                    tool_outputs=tool_outputs
+                )
+                delay = POLL_MIN_INTERVAL
+                continue
+
+            elif run.status in ["failed", "cancelled", "expired"]:
+                answer = f"Erro: A execução falhou com status: {run.status}"
+                break
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX_INTERVAL)
+
+        session.add_turn(prompt, answer, time.perf_counter() - start)
+        return answer
+
+    async def run_session(self, prompts, session_id=None):
+        """Abre uma sessão, envia os prompts em sequência e retorna o estado final."""
+        async with self._slots:
+            session = await self.open_session(session_id)
+            for prompt in prompts:
+                await self.send(session, prompt)
+            return session
+
+    async def run_many(self, conversations):
+        """Executa várias conversas (listas de prompts) concorrentemente."""
+        return await asyncio.gather(*[
+            self.run_session(prompts, session_id=f"s{index}")
+            for index, prompts in enumerate(conversations)
+        ])
+
+    async def close(self):
+        await self.mcp.close()
+        await self.client.close()
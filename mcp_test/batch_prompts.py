@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+
+import instrumentation
+import k8s_assistant
+
+# Prompts executados ao mesmo tempo (cada um em sua própria thread da OpenAI)
+DEFAULT_WORKERS = int(os.getenv("ASSISTANT_BATCH_WORKERS", "4"))
+
+# Tentativas por prompt quando a API responde com limite de requisições
+DEFAULT_MAX_RETRIES = int(os.getenv("ASSISTANT_BATCH_RETRIES", "5"))
+
+
+class RateLimitGate:
+    """Coordena os workers em relação ao limite de requisições da API.
+
+    Quando um worker recebe um 429, todos pausam até o fim da espera (em vez
+    de cada um insistir por conta própria). Opcionalmente, limita o número de
+    prompts iniciados por minuto.
+    """
+
+    def __init__(self, requests_per_minute=0):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.rate_limited = 0
+        self._resume_at = 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._resume_at, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.rate_limited += 1
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def retry_after(error, attempt):
+    """Espera sugerida pela API (header retry-after) ou backoff exponencial com jitter."""
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(header)
+    except (TypeError, ValueError):
+        return min(60.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def last_run_error(thread_id):
+    """Código do erro do último run da thread (ex.: rate_limit_exceeded), se houver."""
+    runs = k8s_assistant.openai.beta.threads.runs.list(thread_id=thread_id, limit=1)
+    if not runs.data or not runs.data[0].last_error:
+        return None
+    return runs.data[0].last_error.code
+
+
+def run_prompt(record, assistant_id, gate, max_retries):
+    """Executa um prompt em uma thread nova, repetindo em caso de limite de requisições."""
+    result = {"id": record.get("id"), "prompt": record["prompt"]}
+    start = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        gate.wait()
+        try:
+            thread = k8s_assistant.openai.beta.threads.create()
+            answer = k8s_assistant.run_turn(thread.id, assistant_id, record["prompt"])
+            if answer:
+                result.update(status="ok", answer=answer, thread_id=thread.id)
+                break
+            error = last_run_error(thread.id)
+            result.update(status="error", error=f"run falhou ({error or 'sem resposta'})", thread_id=thread.id)
+            if error != "rate_limit_exceeded":
+                break
+            gate.pause(retry_after(None, attempt))
+        except openai.RateLimitError as e:
+            result.update(status="error", error=f"limite de requisições: {e}")
+            gate.pause(retry_after(e, attempt))
+        except Exception as e:
+            result.update(status="error", error=repr(e))
+            break
+    result["attempts"] = attempt + 1
+    result["latency_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def read_prompts(path):
+    """Lê o arquivo JSONL de prompts: uma linha por prompt ({"id": ..., "prompt": ...})."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not record.get("prompt"):
+                raise ValueError(f"{path}:{number}: linha sem o campo 'prompt'")
+            record.setdefault("id", number)
+            records.append(record)
+    return records
+
+
+def run_batch(records, assistant_id, output, workers, max_retries, requests_per_minute=0):
+    """Executa os prompts no pool de workers, gravando cada resultado assim que termina."""
+    gate = RateLimitGate(requests_per_minute)
+    write_lock = threading.Lock()
+    results = []
+    start = time.perf_counter()
+
+    # As respostas impressas pelo assistente não fazem sentido com vários prompts em paralelo
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_prompt, record, assistant_id, gate, max_retries) for record in records]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                with write_lock:
+                    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    output.flush()
+
+    return results, time.perf_counter() - start, gate.rate_limited
+
+
+def print_summary(results, elapsed, rate_limited):
+    errors = sum(1 for result in results if result["status"] != "ok")
+    latencies = sorted(result["latency_s"] for result in results)
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0
+    total = len(results) or 1
+    print(f"Prompts: {len(results)} em {elapsed:.2f}s ({len(results) / elapsed:.2f} prompts/s)", file=sys.stderr)
+    print(f"Erros: {errors} ({errors / total:.1%}) | limites de requisição: {rate_limited}", file=sys.stderr)
+    print(f"Latência por prompt: p50 {p50:.2f}s | p95 {p95:.2f}s", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa prompts de um arquivo JSONL em paralelo (modo não interativo)")
+    parser.add_argument("input", help="Arquivo JSONL com os prompts")
+    parser.add_argument("--output", default="-", help="Arquivo JSONL de saída (padrão: stdout)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Prompts executados ao mesmo tempo")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Tentativas extras por prompt ao atingir o limite de requisições")
+    parser.add_argument("--rpm", type=int, default=0, help="Máximo de prompts iniciados por minuto (0 = sem limite)")
+    args = parser.parse_args()
+
+    records = read_prompts(args.input)
+    assistant_id = k8s_assistant.start_assistant()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        results, elapsed, rate_limited = run_batch(
+            records, assistant_id, output, args.workers, args.max_retries, args.rpm
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        instrumentation.flush()
+
+    print_summary(results, elapsed, rate_limited)
+    if any(result["status"] != "ok" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from mcp_client import MCPClient
+from mcp_stub_server import SyntheticCluster, start_server
+
+def run(call, total, workers):
+    """Executa `call` `total` vezes com `workers` threads e retorna requisições/s."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda _: call(), range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cliente HTTP do MCP Server")
+    parser.add_argument("--requests", type=int, default=2000, help="Total de requisições por cenário")
+    parser.add_argument("--workers", type=int, default=4, help="Threads concorrentes")
+    parser.add_argument("--pool-size", type=int, default=10, help="Tamanho do pool do MCPClient")
+    parser.add_argument("--url", help="URL de um MCP Server já em execução (padrão: servidor local)")
+    parser.add_argument("--namespaces", type=int, default=0, help="Namespaces sintéticos do servidor local")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_server(SyntheticCluster(namespaces=args.namespaces))
+
+    payload = {"resourceType": "pods", "namespace": "default"}
+    client = MCPClient(url, pool_size=args.pool_size)
+
+    bare = run(lambda: requests.post(f"{url}/v1/tools/get", json=payload), args.requests, args.workers)
+    pooled = run(lambda: client.post("tools/get", payload), args.requests, args.workers)
+
+    print(f"Servidor: {url}")
+    print(f"requests.post sem pool: {bare:8.1f} req/s")
+    print(f"MCPClient com pool:     {pooled:8.1f} req/s ({pooled / bare:.1f}x)")
+
+    client.close()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+
+import projection
+import table_encoding
+from mcp_stub_server import SyntheticCluster
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+def estimate_tokens(text, encoder=None):
+    """Tokens do texto (tiktoken, se instalado; senão a aproximação de ~4 caracteres por token)."""
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return len(text) // 4
+
+
+def measure(items, resource_type, encoder=None):
+    """Bytes e tokens de cada forma de enviar a mesma lista ao modelo."""
+    response = {"items": items}
+    projected, _ = projection.project_response(resource_type, response, budget=float("inf"))
+    variants = {
+        # Todas as variantes com a mesma serialização compacta: a diferença vem só do formato
+        "json (resposta original)": table_encoding.compact_dumps(response),
+        "json (projetado)": table_encoding.dumps(projected, "json"),
+        "table (projetado)": table_encoding.dumps(projected, "table"),
+    }
+    return {
+        name: {"bytes": len(text.encode("utf-8")), "tokens": estimate_tokens(text, encoder)}
+        for name, text in variants.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o tamanho das saídas em JSON e no formato de tabela")
+    parser.add_argument("--namespaces", type=int, default=20, help="Namespaces do cluster sintético")
+    parser.add_argument("--deployments", type=int, default=25, help="Deployments por namespace")
+    parser.add_argument("--pods", type=int, default=20, help="Pods por deployment")
+    args = parser.parse_args()
+
+    cluster = SyntheticCluster(
+        namespaces=args.namespaces,
+        deployments_per_namespace=args.deployments,
+        pods_per_deployment=args.pods,
+        nodes=10,
+        include_simulation=False,
+    )
+    encoder = tiktoken.encoding_for_model("gpt-4o") if tiktoken else None
+    print(f"Tokens: {'tiktoken' if encoder else 'estimativa (bytes / 4)'}")
+
+    for resource_type in ("pods", "deployments", "services"):
+        items = cluster.list(resource_type, "all")
+        results = measure(items, resource_type, encoder)
+        baseline = results["json (projetado)"]
+        print(f"\n{resource_type}: {len(items)} itens")
+        print(f"{'formato':<28}{'bytes':>12}{'tokens':>12}{'vs json projetado':>20}")
+        for name, r in results.items():
+            saved = 1 - r["bytes"] / baseline["bytes"]
+            print(f"{name:<28}{r['bytes']:>12}{r['tokens']:>12}{saved:>19.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+MODES = ("json", "stream")
+
+
+def read_full(client, payload):
+    """Caminho anterior: response.json() monta a lista inteira antes da projeção."""
+    import projection
+
+    response = client.post("tools/get", payload)
+    result, _ = projection.project_response(payload["resourceType"], response.json())
+    return json.dumps(result)
+
+
+def read_streamed(client, payload):
+    """Streaming: os itens são lidos e projetados um a um, sem guardar a resposta bruta."""
+    import projection
+    from streaming_json import ItemStream
+
+    response = client.post("tools/get", payload, stream=True)
+    result, _ = projection.project_response(payload["resourceType"], ItemStream.from_response(response))
+    return json.dumps(result)
+
+
+def peak_rss_kb():
+    """Pico de memória residente do processo (VmHWM no Linux; senão ru_maxrss)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss é herdado através do exec, por isso fica como alternativa
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(url, mode, resource_type, trace):
+    """Executa uma leitura em um processo novo e retorna tempo, pico de RSS e (opcional) pico do tracemalloc."""
+    from mcp_client import MCPClient
+
+    client = MCPClient(url)
+    payload = {"resourceType": resource_type, "namespace": "all"}
+    reader = read_streamed if mode == "stream" else read_full
+
+    # O pico só cresce: a diferença é o pico causado pela leitura
+    rss_before = peak_rss_kb()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    output = reader(client, payload)
+    elapsed = time.perf_counter() - start
+    result = {
+        "mode": mode,
+        "seconds": round(elapsed, 3),
+        "rss_peak_kb": peak_rss_kb() - rss_before,
+        "output_bytes": len(output),
+    }
+    if trace:
+        result["traced_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return result
+
+
+def run_child(url, mode, resource_type, trace):
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--url", url,
+               "--resource-type", resource_type]
+    if trace:
+        command.append("--tracemalloc")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o pico de memória de response.json() e da leitura em streaming")
+    parser.add_argument("--namespaces", type=int, default=50, help="Namespaces do cluster sintético")
+    parser.add_argument("--deployments", type=int, default=20, help="Deployments por namespace")
+    parser.add_argument("--pods", type=int, default=20, help="Pods por deployment")
+    parser.add_argument("--resource-type", default="pods", help="Tipo de recurso listado")
+    parser.add_argument("--url", help="URL de um MCP Server já em execução (padrão: servidor local)")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--tracemalloc", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.url, args.child, args.resource_type, args.tracemalloc)))
+        return
+
+    server = None
+    url = args.url
+    if not url:
+        from mcp_stub_server import SyntheticCluster, start_server
+
+        print("Gerando cluster sintético...")
+        cluster = SyntheticCluster(
+            namespaces=args.namespaces,
+            deployments_per_namespace=args.deployments,
+            pods_per_deployment=args.pods,
+            nodes=10,
+            include_simulation=False,
+        )
+        server, url = start_server(cluster)
+        body = cluster.list_json(args.resource_type, "all")
+        print(f"{args.resource_type}: {len(json.loads(body)['items'])} itens, {len(body) / 1024 / 1024:.1f} MiB de JSON")
+
+    # Cada medição roda em um processo novo (o pico de RSS de um processo nunca diminui);
+    # o tracemalloc deixa a leitura mais lenta, então é medido em uma execução separada
+    print(f"{'modo':<10}{'tempo (s)':>12}{'pico RSS (MiB)':>18}{'pico tracemalloc (MiB)':>26}{'saída (bytes)':>16}")
+    results = {}
+    for mode in MODES:
+        r = run_child(url, mode, args.resource_type, trace=False)
+        r["traced_peak_kb"] = run_child(url, mode, args.resource_type, trace=True)["traced_peak_kb"]
+        results[mode] = r
+        print(f"{mode:<10}{r['seconds']:>12.3f}{r['rss_peak_kb'] / 1024:>18.1f}"
+              f"{r['traced_peak_kb'] / 1024:>26.1f}{r['output_bytes']:>16}")
+
+    full, streamed = results["json"], results["stream"]
+    if full["rss_peak_kb"]:
+        print(f"\nStreaming: pico de RSS {1 - streamed['rss_peak_kb'] / full['rss_peak_kb']:.0%} menor, "
+              f"pico do tracemalloc {1 - streamed['traced_peak_kb'] / max(1, full['traced_peak_kb']):.0%} menor")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+# k8s_assistant exige a chave na importação; o backend aqui é o FakeOpenAI ou uma gravação
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import cassette as cassettes
+import k8s_assistant
+from fake_openai import FakeOpenAI
+from manifest_store import ManifestStore
+from mcp_client import get_client
+from mcp_stub_server import SyntheticCluster, start_server
+from transcript import clear_transcripts
+
+# Conversa roteirizada padrão, baseada nos exemplos do README
+DEFAULT_SCRIPT = [
+    {
+        "prompt": "Exiba o status de todos os pods, deployments, services e nós",
+        "steps": [{"tool_calls": [
+            {"name": "getKubernetesResources", "arguments": {"resourceType": "pods"}},
+            {"name": "getKubernetesResources", "arguments": {"resourceType": "deployments"}},
+            {"name": "getKubernetesResources", "arguments": {"resourceType": "services"}},
+            {"name": "getKubernetesResources", "arguments": {"resourceType": "nodes"}},
+        ]}],
+        "answer": "Todos os recursos estão saudáveis.",
+    },
+    {
+        "prompt": "Escale o deployment 'nginx-deployment' para 5 réplicas",
+        "steps": [
+            {"tool_calls": [{"name": "getKubernetesResources", "arguments": {"resourceType": "deployments"}}]},
+            {"tool_calls": [{"name": "applyKubernetesConfig", "arguments": {
+                "config": "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: nginx-deployment\n"
+                          "spec:\n  replicas: 5\n"}}]},
+        ],
+        "answer": "Deployment escalado para 5 réplicas.",
+    },
+    {
+        "prompt": "Quais namespaces existem no cluster?",
+        "steps": [{"tool_calls": [{"name": "getKubernetesResources", "arguments": {"resourceType": "namespaces"}}]}],
+        "answer": "default, kube-system, kube-public e kube-node-lease.",
+    },
+]
+
+
+class StageTimer:
+    """Acumula durações por etapa do turno."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+
+def percentile(values, pct):
+    """Percentil pelo método nearest-rank."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(timer, elapsed, turns):
+    stages = {}
+    for stage, values in timer.samples.items():
+        stages[stage] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "total_ms": round(sum(values) * 1000, 3),
+        }
+    return {
+        "turns": turns,
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(turns / elapsed, 2) if elapsed else 0.0,
+        "stages": stages,
+    }
+
+
+def instrument(fake, timer):
+    """Envolve as chamadas da API falsa e as etapas do k8s_assistant com medição de tempo."""
+    threads = fake.beta.threads
+    threads.messages.create = timer.wrap("messages.create", threads.messages.create)
+    threads.messages.list = timer.wrap("messages.list", threads.messages.list)
+    threads.runs.create = timer.wrap("runs.create", threads.runs.create)
+    threads.runs.retrieve = timer.wrap("runs.retrieve", threads.runs.retrieve)
+    threads.runs.submit_tool_outputs = timer.wrap("submit_tool_outputs", threads.runs.submit_tool_outputs)
+
+    k8s_assistant.openai = fake
+    k8s_assistant.poll_run = timer.wrap("polling_loop", k8s_assistant.poll_run)
+    k8s_assistant.process_tool_calls = timer.wrap("process_tool_calls", k8s_assistant.process_tool_calls)
+    k8s_assistant.call_mcp_server = timer.wrap("call_mcp_server", k8s_assistant.call_mcp_server)
+
+
+def run_benchmark(script, iterations, openai_latency, thinking_polls, cluster, use_cache):
+    server, url = start_server(cluster)
+    fake = FakeOpenAI(script, latency=openai_latency, thinking_polls=thinking_polls)
+    timer = StageTimer()
+
+    k8s_assistant.MCP_SERVER_URL = url
+    k8s_assistant.USE_SIMULATION = False
+    k8s_assistant.USE_STREAMING = False
+    k8s_assistant.SHOW_TIMINGS = False
+    k8s_assistant.USE_CACHE = use_cache
+    instrument(fake, timer)
+
+    thread = fake.beta.threads.create()
+    turns = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Registro de manifestos novo (em memória) a cada iteração: os applies do roteiro
+        # chegam ao MCP Server em todas elas, em vez de virarem "unchanged" a partir da segunda
+        k8s_assistant.manifest_store = ManifestStore(path="")
+        for turn in script:
+            turn_start = time.perf_counter()
+            # As respostas são impressas pelo assistente; descartá-las no benchmark
+            with contextlib.redirect_stdout(io.StringIO()):
+                k8s_assistant.run_turn(thread.id, "asst_benchmark", turn["prompt"])
+            timer.record("turn", time.perf_counter() - turn_start)
+            turns += 1
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    return summarize(timer, elapsed, turns)
+
+
+def session_from_cassette(cassette):
+    """Assistant, thread, prompts e modo (streaming ou polling) de uma sessão gravada."""
+    assistant_id = thread_id = None
+    prompts = []
+    streaming = False
+    for interaction in cassette.interactions:
+        if interaction["source"] != "openai" or interaction["method"] != "POST":
+            continue
+        body = json.loads(interaction["body"] or "{}")
+        if interaction["url"].endswith("/messages") and body.get("role") == "user":
+            thread_id = thread_id or interaction["url"].split("/")[3]
+            prompts.append(body["content"])
+        elif interaction["url"].endswith("/runs"):
+            assistant_id = assistant_id or body.get("assistant_id")
+            streaming = streaming or bool(body.get("stream"))
+    return assistant_id, thread_id, prompts, streaming
+
+
+def run_cassette_benchmark(path, iterations, latency):
+    """Reproduz uma sessão gravada (OpenAI e MCP Server), sem rede, medindo as mesmas etapas."""
+    cassette = cassettes.install(k8s_assistant.openai, get_client(k8s_assistant.MCP_SERVER_URL),
+                                 path, "replay", latency)
+    assistant_id, thread_id, prompts, streaming = session_from_cassette(cassette)
+    if not prompts:
+        raise ValueError(f"Nenhuma mensagem do usuário na gravação {path}")
+    timer = StageTimer()
+
+    k8s_assistant.USE_SIMULATION = False
+    k8s_assistant.USE_STREAMING = streaming
+    k8s_assistant.SHOW_TIMINGS = False
+    instrument(k8s_assistant.openai, timer)
+
+    turns = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Cada repetição parte do mesmo estado local da gravação
+        cassette.rewind()
+        k8s_assistant.resource_cache.clear()
+        k8s_assistant.manifest_store = ManifestStore(path="")
+        clear_transcripts()
+        for prompt in prompts:
+            turn_start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                k8s_assistant.run_turn(thread_id, assistant_id, prompt)
+            timer.record("turn", time.perf_counter() - turn_start)
+            turns += 1
+    elapsed = time.perf_counter() - start
+
+    results = summarize(timer, elapsed, turns)
+    results["cassette"] = cassette.stats()
+    return results
+
+
+def print_report(results):
+    print(f"Turnos: {results['turns']} em {results['elapsed_s']:.2f}s ({results['turns_per_s']:.2f} turnos/s)")
+    print(f"{'etapa':<22}{'n':>7}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}{'total (ms)':>13}")
+    for stage, s in sorted(results["stages"].items(), key=lambda pair: -pair[1]["total_ms"]):
+        print(f"{stage:<22}{s['count']:>7}{s['p50_ms']:>12.2f}{s['p95_ms']:>12.2f}{s['p99_ms']:>12.2f}{s['total_ms']:>13.2f}")
+
+
+def compare(results, baseline, threshold):
+    """Compara p50/p95 por etapa com uma execução anterior; retorna o número de regressões."""
+    regressions = 0
+    print(f"\nComparação com a execução anterior (limite: +{threshold:.0f}%)")
+    for stage, current in sorted(results["stages"].items()):
+        previous = baseline.get("stages", {}).get(stage)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if not previous[metric]:
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric] * 100
+            flag = ""
+            if change > threshold:
+                flag = "  <-- REGRESSÃO"
+                regressions += 1
+            print(f"{stage:<22}{metric:>8}: {previous[metric]:>10.2f} -> {current[metric]:>10.2f} ({change:+.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latência do turno completo do assistente")
+    parser.add_argument("--script", help="Arquivo JSON com a lista de turnos roteirizados")
+    parser.add_argument("--iterations", type=int, default=20, help="Repetições do roteiro")
+    parser.add_argument("--openai-latency", type=float, default=0.0, help="Latência simulada por chamada à API (s)")
+    parser.add_argument("--thinking-polls", type=int, default=1, help="Consultas in_progress antes de cada passo")
+    parser.add_argument("--namespaces", type=int, default=0, help="Namespaces do cluster sintético")
+    parser.add_argument("--no-cache", action="store_true", help="Desativar o cache de recursos")
+    parser.add_argument("--cassette", help="Reproduzir uma sessão gravada (ASSISTANT_CASSETTE_MODE=record) em vez do roteiro")
+    parser.add_argument("--cassette-latency", choices=cassettes.LATENCIES, default="zero",
+                        help="Reproduzir a gravação com a latência original ou sem espera")
+    parser.add_argument("--save", help="Salvar os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Aumento percentual considerado regressão")
+    args = parser.parse_args()
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+
+    if args.cassette:
+        results = run_cassette_benchmark(args.cassette, args.iterations, args.cassette_latency)
+    else:
+        results = run_benchmark(
+            script,
+            args.iterations,
+            args.openai_latency,
+            args.thinking_polls,
+            SyntheticCluster(namespaces=args.namespaces),
+            use_cache=not args.no_cache,
+        )
+    print_report(results)
+    if results.get("cassette", {}).get("misses"):
+        print(f"AVISO: {results['cassette']['misses']} requisições não encontradas na gravação")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Gravação/reprodução das chamadas à OpenAI e ao MCP Server (vazio = desativado)
+CASSETTE_PATH = os.getenv("ASSISTANT_CASSETTE", "")
+CASSETTE_MODE = os.getenv("ASSISTANT_CASSETTE_MODE", "replay")
+CASSETTE_LATENCY = os.getenv("ASSISTANT_CASSETTE_LATENCY", "zero")
+
+MODES = ("record", "replay")
+LATENCIES = ("original", "zero")
+
+# Cabeçalhos de resposta mantidos na gravação (o resto é descartado)
+_KEPT_HEADERS = ("content-type",)
+
+
+class CassetteMiss(Exception):
+    """Requisição sem interação correspondente na gravação."""
+
+
+def _canonical_body(body):
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+def request_key(source, method, url, body):
+    """Chave da interação: origem, método, URL e hash do corpo JSON canônico."""
+    digest = hashlib.sha256(_canonical_body(body).encode("utf-8")).hexdigest()[:16]
+    return f"{source} {method.upper()} {url} {digest}"
+
+
+class Cassette:
+    """Interações HTTP gravadas em um arquivo JSONL compactado com gzip.
+
+    Na reprodução, cada requisição recebe a próxima resposta gravada com a
+    mesma chave (método, URL e corpo); se as respostas daquela chave acabarem,
+    a última é repetida (útil para polling e health checks). A latência
+    original pode ser reproduzida ou descartada.
+    """
+
+    def __init__(self, path, mode="replay", latency="zero"):
+        if mode not in MODES:
+            raise ValueError(f"Modo de gravação inválido: {mode} (use {', '.join(MODES)})")
+        if latency not in LATENCIES:
+            raise ValueError(f"Latência inválida: {latency} (use {', '.join(LATENCIES)})")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions = []
+        self.hits = 0
+        self.misses = 0
+        self._queues = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.interactions = [json.loads(line) for line in f if line.strip()]
+            self.rewind()
+
+    def rewind(self):
+        """Volta ao início da gravação (para reproduzir a mesma sessão várias vezes)."""
+        with self._lock:
+            self._queues = {}
+            self._last = {}
+            for interaction in self.interactions:
+                self._queues.setdefault(interaction["key"], deque()).append(interaction)
+
+    def record(self, source, method, url, body, status, headers, content, elapsed):
+        interaction = {
+            "key": request_key(source, method, url, body),
+            "source": source,
+            "method": method.upper(),
+            "url": url,
+            "body": _canonical_body(body),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() in _KEPT_HEADERS},
+            "content": content.decode("utf-8", "replace"),
+            "elapsed": round(elapsed, 4),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, source, method, url, body):
+        """Próxima interação gravada para a requisição (aguardando a latência original, se pedido)."""
+        key = request_key(source, method, url, body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                interaction = self._last[key] = queue.popleft()
+            else:
+                interaction = self._last.get(key)
+            if interaction is None:
+                self.misses += 1
+                raise CassetteMiss(f"Requisição não gravada: {method.upper()} {url}")
+            self.hits += 1
+        if self.latency == "original":
+            time.sleep(interaction["elapsed"])
+        return interaction
+
+    def save(self):
+        if self.mode != "record":
+            return
+        with self._lock:
+            interactions = list(self.interactions)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for interaction in interactions:
+                f.write(json.dumps(interaction, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        with self._lock:
+            return {"mode": self.mode, "interactions": len(self.interactions), "hits": self.hits, "misses": self.misses}
+
+
+def openai_transport(cassette):
+    """Transporte httpx para o cliente da OpenAI (`http_client`) que grava ou reproduz as chamadas."""
+    import httpx
+
+    class CassetteTransport(httpx.BaseTransport):
+        def __init__(self):
+            self.inner = httpx.HTTPTransport() if cassette.mode == "record" else None
+
+        def handle_request(self, request):
+            url = request.url.raw_path.decode("ascii")
+            body = request.read()
+            if cassette.mode == "replay":
+                interaction = cassette.play("openai", request.method, url, body)
+                return httpx.Response(
+                    interaction["status"],
+                    headers=interaction["headers"],
+                    content=interaction["content"].encode("utf-8"),
+                    request=request,
+                )
+
+            start = time.perf_counter()
+            response = self.inner.handle_request(request)
+            content = response.read()
+            headers = {k: v for k, v in response.headers.items() if k.lower() in _KEPT_HEADERS}
+            cassette.record("openai", request.method, url, body, response.status_code, headers,
+                            content, time.perf_counter() - start)
+            return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    return CassetteTransport()
+
+
+def mcp_adapter(cassette, inner):
+    """Adapter do requests para o MCP Server que grava ou reproduz as chamadas de `inner`."""
+    import requests
+    from requests.adapters import BaseAdapter
+    from requests.structures import CaseInsensitiveDict
+    from urllib.parse import urlsplit
+
+    class CassetteAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            url = urlsplit(request.url)
+            path = url.path + (f"?{url.query}" if url.query else "")
+            if cassette.mode == "replay":
+                try:
+                    interaction = cassette.play("mcp", request.method, path, request.body)
+                except CassetteMiss as e:
+                    raise requests.ConnectionError(str(e), request=request)
+                response = requests.Response()
+                response.status_code = interaction["status"]
+                response.headers = CaseInsensitiveDict(interaction["headers"])
+                response._content = interaction["content"].encode("utf-8")
+                # Corpo já disponível: iter_content lê de _content (respostas em streaming)
+                response._content_consumed = True
+                response.encoding = "utf-8"
+                response.url = request.url
+                response.request = request
+                return response
+
+            start = time.perf_counter()
+            response = inner.send(request, **kwargs)
+            cassette.record("mcp", request.method, path, request.body, response.status_code,
+                            response.headers, response.content, time.perf_counter() - start)
+            return response
+
+        def close(self):
+            inner.close()
+
+    return CassetteAdapter()
+
+
+def install(openai_module, mcp_client, path=CASSETTE_PATH, mode=CASSETTE_MODE, latency=CASSETTE_LATENCY):
+    """Passa as chamadas do módulo openai e do cliente do MCP Server pela gravação."""
+    import httpx
+
+    cassette = Cassette(path, mode, latency)
+    openai_module.http_client = httpx.Client(transport=openai_transport(cassette))
+    for session in (mcp_client.session, mcp_client.probe_session):
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, mcp_adapter(cassette, session.get_adapter(prefix)))
+    if mode == "record":
+        atexit.register(cassette.save)
+    return cassette
@@ -0,0 +1,70 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Tempo máximo (segundos) entre iniciar o processo e o prompt aparecer
+DEFAULT_BUDGET = float(os.getenv("ASSISTANT_STARTUP_BUDGET", "0.5"))
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "k8s_assistant.py")
+PROMPT = "Você: ".encode("utf-8")
+
+
+def measure_cold_start(env):
+    """Inicia o assistente em um processo novo e mede o tempo até o prompt; retorna (segundos, saída)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, SCRIPT, "--profile-startup"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        env=env,
+    )
+    output = b""
+    while PROMPT not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"o assistente encerrou antes do prompt:\n{output.decode('utf-8', 'replace')}")
+        output += chunk
+    elapsed = time.perf_counter() - start
+
+    rest, _ = process.communicate(b"sair\n", timeout=30)
+    return elapsed, (output + rest).decode("utf-8", "replace")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a inicialização a frio do assistente e verifica o orçamento")
+    parser.add_argument("--runs", type=int, default=5, help="Número de inicializações medidas")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Tempo máximo até o prompt (s)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    env.setdefault("OPENAI_API_KEY", "sk-startup-check")
+    # A preparação em segundo plano não deve criar threads reais durante a medição
+    env["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+    env["ASSISTANT_METRICS_FILE"] = ""
+    env["ASSISTANT_TRACE_FILE"] = ""
+
+    timings = []
+    output = ""
+    for _ in range(args.runs):
+        elapsed, output = measure_cold_start(env)
+        timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(f"Tempo até o prompt: mediana {median:.3f}s | mín {min(timings):.3f}s | máx {max(timings):.3f}s "
+          f"({args.runs} execuções, orçamento {args.budget:.3f}s)")
+    # Perfil da última execução, exibido pelo assistente ao sair
+    if "=== Perfil de inicialização ===" in output:
+        print(output[output.index("=== Perfil de inicialização ==="):].split("Encerrando")[0].rstrip())
+
+    if median > args.budget:
+        print("FALHA: a inicialização passou do orçamento")
+        sys.exit(1)
+    print("OK: inicialização dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+
+import instrumentation
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv("MCP_BREAKER_FAILURES", "3"))
+DEFAULT_RESET_TIMEOUT = float(os.getenv("MCP_BREAKER_RESET", "15"))
+DEFAULT_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "5"))
+HEALTH_TIMEOUT = float(os.getenv("MCP_HEALTH_TIMEOUT", "2"))
+
+
+class CircuitBreaker:
+    """Circuit breaker clássico: fechado -> aberto após falhas -> meio-aberto para sondar.
+
+    Com o circuito aberto, as chamadas falham imediatamente (sem esperar
+    timeouts). Depois de `reset_timeout` segundos, uma única chamada de sonda é
+    liberada: sucesso fecha o circuito, falha o abre novamente.
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self.total_failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        instrumentation.inc("circuit_state_changes_total", breaker=self.name, state=state)
+        if self.on_change:
+            self.on_change(self, previous, state)
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def release(self):
+        """Chamada liberada que terminou sem resultado (ex.: cancelada): libera a chamada de teste."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.total_failures,
+                "rejected": self.rejected,
+            }
+
+
+class HealthManager:
+    """Estado de saúde do MCP Server: health check em segundo plano e um breaker por endpoint.
+
+    Substitui a decisão única de usar simulação tomada na inicialização: o
+    servidor é considerado indisponível enquanto o health check falhar, e
+    volta a ser usado automaticamente quando ele se recupera.
+    """
+
+    def __init__(self, health_fn, interval=DEFAULT_HEALTH_INTERVAL, on_change=None):
+        self.health_fn = health_fn
+        self.interval = interval
+        self.on_change = on_change
+        self.health = CircuitBreaker("health", failure_threshold=1, on_change=on_change)
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def breaker(self, endpoint):
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(endpoint, on_change=self.on_change)
+            return breaker
+
+    def available(self):
+        return self.health.state != OPEN
+
+    def check(self):
+        """Executa um health check e atualiza o estado; retorna True se saudável."""
+        try:
+            healthy = self.health_fn(HEALTH_TIMEOUT).status_code == 200
+        except Exception:
+            healthy = False
+        if healthy:
+            self.health.record_success()
+        else:
+            self.health.record_failure()
+        return healthy
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mcp-health", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        stats = {"health": self.health.stats()}
+        stats.update({endpoint: breaker.stats() for endpoint, breaker in breakers.items()})
+        return stats
@@ -0,0 +1,108 @@
+import json
+import os
+
+import instrumentation
+from projection import get_path, summarize
+from tools_schema import ASSISTANT_MODEL
+from transcript import get_transcript
+
+# Tamanho (bytes de texto) a partir do qual a thread é substituída por uma nova
+COMPACT_THRESHOLD = int(os.getenv("ASSISTANT_COMPACT_THRESHOLD", "200000"))
+
+# Quantidade de texto da transcrição enviada para o resumo
+SUMMARY_INPUT_CHARS = int(os.getenv("ASSISTANT_SUMMARY_INPUT_CHARS", "24000"))
+
+SNAPSHOT_TYPES = ["namespaces", "nodes", "deployments", "pods", "services"]
+
+# Namespaces com contagem no snapshot (os demais entram em otherNamespaces)
+SNAPSHOT_TOP_NAMESPACES = int(os.getenv("ASSISTANT_SNAPSHOT_TOP_NAMESPACES", "10"))
+
+SUMMARY_PROMPT = (
+    "Resuma a conversa abaixo entre um operador e um assistente de Kubernetes. "
+    "Mantenha pedidos em aberto, decisões tomadas, recursos criados ou alterados "
+    "(kind, namespace, nome) e problemas encontrados. Responda em até 15 linhas."
+)
+
+
+def cluster_snapshot(get_resources):
+    """Resumo compacto do estado atual do cluster a partir de `get_resources(tipo, namespace)`."""
+    snapshot = {}
+    for resource_type in SNAPSHOT_TYPES:
+        response = get_resources(resource_type, "all")
+        items = response.get("items") if isinstance(response, dict) else None
+        if not isinstance(items, list):
+            continue
+        entry = {"total": len(items)}
+        if resource_type in ("namespaces", "nodes"):
+            entry["names"] = [get_path(item, "metadata.name") for item in items][:50]
+        elif resource_type == "deployments":
+            # Apenas os deployments com réplicas indisponíveis
+            entry["notReady"] = [
+                f"{get_path(item, 'metadata.name')}: {get_path(item, 'status.readyReplicas') or 0}/"
+                f"{get_path(item, 'spec.replicas') or 0}"
+                for item in items
+                if (get_path(item, "status.readyReplicas") or 0) < (get_path(item, "spec.replicas") or 0)
+            ][:50]
+        else:
+            entry.update(summarize(items, top=SNAPSHOT_TOP_NAMESPACES))
+        snapshot[resource_type] = entry
+    return snapshot
+
+
+def _local_summary(transcript):
+    # Sem acesso ao modelo de resumo: manter os últimos pedidos e respostas, truncados
+    lines = []
+    for entry in transcript.messages[-10:]:
+        text = " ".join(entry["text"].split())
+        lines.append(f"- {entry['role']}: {text[:300]}")
+    return "\n".join(lines)
+
+
+def summarize_transcript(client, transcript):
+    """Resumo da conversa gerado pelo modelo (ou um resumo local, se indisponível)."""
+    text = "\n".join(f"{entry['role']}: {entry['text']}" for entry in transcript.messages)
+    try:
+        completion = client.chat.completions.create(
+            model=ASSISTANT_MODEL,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": text[-SUMMARY_INPUT_CHARS:]},
+            ],
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        print(f"AVISO: não foi possível resumir a conversa com o modelo ({e}); usando resumo local")
+        return _local_summary(transcript)
+
+
+def compact_if_needed(client, thread_id, get_resources, threshold=COMPACT_THRESHOLD):
+    """Substitui a thread por uma nova, resumida, quando o contexto passa do limite.
+
+    A nova thread recebe uma única mensagem com o resumo da conversa e um
+    snapshot do estado do cluster. Retorna o ID da thread a ser usada.
+    """
+    transcript = get_transcript(thread_id)
+    before = transcript.context_size()
+    if threshold <= 0 or before < threshold:
+        return thread_id
+
+    summary = summarize_transcript(client, transcript)
+    snapshot = cluster_snapshot(get_resources)
+    seed = (
+        "Contexto da conversa anterior (a thread foi compactada):\n"
+        f"{summary}\n\n"
+        "Estado atual do cluster:\n"
+        f"{json.dumps(snapshot, ensure_ascii=False)}"
+    )
+
+    thread = client.beta.threads.create()
+    message = client.beta.threads.messages.create(thread_id=thread.id, role="user", content=seed)
+    new_transcript = get_transcript(thread.id)
+    new_transcript.record(message)
+    after = new_transcript.context_size()
+
+    instrumentation.inc("thread_compactions_total")
+    instrumentation.observe("context_bytes_before_compaction", before)
+    instrumentation.observe("context_bytes_after_compaction", after)
+    print(f"\n[contexto] thread compactada: {before} -> {after} bytes (nova thread: {thread.id})")
+    return thread.id
@@ -2,6 +2,8 @@ import os
 import openai
 import json
 from dotenv import load_dotenv
+from assistant_registry import get_or_create_assistant
+from tools_schema import ASSISTANT_MODEL, KUBERNETES_TOOLS
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -33,7 +35,7 @@ mcp_openapi_spec = {
                 "summary": "Aplicar uma configuração Kubernetes",
                 "operationId": "applyKubernetesConfig",
                 "requestBody": {
-                    "required": true,
+                    "required": True,
                     "content": {
                         "application/json": {
                             "schema": {
@@ -61,7 +63,7 @@ mcp_openapi_spec = {
                 "summary": "Obter recursos Kubernetes",
                 "operationId": "getKubernetesResources",
                 "requestBody": {
-                    "required": true,
+                    "required": True,
                     "content": {
                         "application/json": {
                             "schema": {
@@ -91,58 +93,19 @@ mcp_openapi_spec = {
     }
 }
 
-# Criação do Assistant
-assistant = openai.beta.assistants.create(
+# Criação do Assistant (reutiliza o ID registrado se a definição não mudou)
+assistant_id = get_or_create_assistant(
     name="Kubernetes MCP Assistant",
     instructions="""
     Você é um assistente especializado em gerenciar clusters Kubernetes. 
     Você pode ajudar a criar, listar e gerenciar recursos como pods, deployments, services, etc.
     Use as ferramentas disponíveis para interagir com o cluster Kubernetes via MCP Server.
     """,
-    model="gpt-4o",
-    tools=[
-        {
-            "type": "function",
-            "function": {
-                "name": "applyKubernetesConfig",
-                "description": "Aplica uma configuração YAML no cluster Kubernetes",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "config": {
-                            "type": "string",
-                            "description": "YAML ou JSON contendo a configuração Kubernetes a ser aplicada"
-                        }
-                    },
-                    "required": ["config"]
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "getKubernetesResources",
-                "description": "Obtém recursos Kubernetes do cluster",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "resourceType": {
-                            "type": "string",
-                            "description": "Tipo de recurso Kubernetes (pods, deployments, services, etc.)"
-                        },
-                        "namespace": {
-                            "type": "string",
-                            "description": "Namespace dos recursos (padrão: default)"
-                        }
-                    },
-                    "required": ["resourceType"]
-                }
-            }
-        }
-    ]
+    tools=KUBERNETES_TOOLS,
+    model=ASSISTANT_MODEL
 )
 
-print(f"Assistant criado com ID: {assistant.id}")
+print(f"Assistant criado com ID: {assistant_id}")
 print("Você pode usar este ID para interagir com o Assistant na sua aplicação.")
 print("Exemplo de como iniciar uma thread e enviar uma mensagem:")
 print("""
@@ -0,0 +1,146 @@
+import itertools
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeOpenAI:
+    """Substituto de `openai` (somente beta.threads) que reproduz conversas roteirizadas.
+
+    Cada turno do roteiro tem a forma:
+
+        {"prompt": "...",
+         "steps": [{"tool_calls": [{"name": "getKubernetesResources",
+                                     "arguments": {"resourceType": "pods"}}]}],
+         "answer": "..."}
+
+    Os runs passam por `in_progress` (durante `thinking_polls` consultas),
+    `requires_action` para cada passo e `completed` ao final. `latency` simula
+    o tempo de rede de cada chamada à API.
+    """
+
+    def __init__(self, turns, latency=0.0, thinking_polls=1):
+        self.latency = latency
+        self.thinking_polls = thinking_polls
+        self.calls = {}
+        self._turns = list(turns)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._runs = {}
+
+        self.beta = SimpleNamespace(threads=SimpleNamespace(
+            create=self._create_thread,
+            messages=SimpleNamespace(create=self._create_message, list=self._list_messages),
+            runs=SimpleNamespace(
+                create=self._create_run,
+                retrieve=self._retrieve_run,
+                submit_tool_outputs=self._submit_tool_outputs,
+            ),
+        ))
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _new_id(self, prefix):
+        return f"{prefix}_{next(self._ids)}"
+
+    def _create_thread(self, **kwargs):
+        self._call("threads.create")
+        thread_id = self._new_id("thread")
+        self._threads[thread_id] = {"messages": [], "turn": 0}
+        return SimpleNamespace(id=thread_id)
+
+    def _create_message(self, thread_id, role, content, **kwargs):
+        self._call("messages.create")
+        message = self._message(thread_id, role, content, run_id=None)
+        self._threads[thread_id]["messages"].append(message)
+        return message
+
+    def _message(self, thread_id, role, text, run_id):
+        return SimpleNamespace(
+            id=self._new_id("msg"),
+            thread_id=thread_id,
+            role=role,
+            run_id=run_id,
+            content=[SimpleNamespace(type="text", text=SimpleNamespace(value=text, annotations=[]))],
+        )
+
+    def _list_messages(self, thread_id, order="desc", after=None, run_id=None, limit=20, **kwargs):
+        self._call("messages.list")
+        messages = list(self._threads[thread_id]["messages"])
+        if run_id:
+            messages = [m for m in messages if m.run_id == run_id]
+        if after:
+            ids = [m.id for m in messages]
+            messages = messages[ids.index(after) + 1:] if after in ids else messages
+        if order == "desc":
+            messages.reverse()
+        return SimpleNamespace(data=messages[:limit], has_more=len(messages) > limit)
+
+    def _create_run(self, thread_id, assistant_id, **kwargs):
+        self._call("runs.create")
+        thread = self._threads[thread_id]
+        turn = self._turns[thread["turn"] % len(self._turns)]
+        thread["turn"] += 1
+
+        run_id = self._new_id("run")
+        self._runs[run_id] = {
+            "thread_id": thread_id,
+            "turn": turn,
+            "step": 0,
+            "polls": 0,
+            "waiting": False,
+            "status": "queued",
+        }
+        return SimpleNamespace(id=run_id, status="queued")
+
+    def _retrieve_run(self, thread_id, run_id, **kwargs):
+        self._call("runs.retrieve")
+        state = self._runs[run_id]
+        steps = state["turn"].get("steps", [])
+
+        if state["status"] in ("queued", "in_progress") and not state["waiting"]:
+            state["polls"] += 1
+            if state["polls"] <= self.thinking_polls:
+                state["status"] = "in_progress"
+            elif state["step"] < len(steps):
+                state["status"] = "requires_action"
+                state["waiting"] = True
+            else:
+                state["status"] = "completed"
+                answer = state["turn"].get("answer", "")
+                self._threads[thread_id]["messages"].append(self._message(thread_id, "assistant", answer, run_id))
+
+        return self._run_object(run_id, state)
+
+    def _run_object(self, run_id, state):
+        required_action = None
+        if state["status"] == "requires_action":
+            step = state["turn"]["steps"][state["step"]]
+            tool_calls = [
+                SimpleNamespace(
+                    id=f"call_{run_id}_{state['step']}_{index}",
+                    type="function",
+                    function=SimpleNamespace(name=call["name"], arguments=json.dumps(call.get("arguments", {}))),
+                )
+                for index, call in enumerate(step["tool_calls"])
+            ]
+            required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=tool_calls))
+        return SimpleNamespace(id=run_id, status=state["status"], required_action=required_action, last_error=None)
+
+    def _submit_tool_outputs(self, thread_id, run_id, tool_outputs, **kwargs):
+        self._call("runs.submit_tool_outputs")
+        state = self._runs[run_id]
+        expected = len(state["turn"]["steps"][state["step"]]["tool_calls"])
+        if len(tool_outputs) != expected:
+            raise ValueError(f"Esperadas {expected} saídas de ferramentas, recebidas {len(tool_outputs)}")
+        state["step"] += 1
+        state["polls"] = 0
+        state["waiting"] = False
+        state["status"] = "in_progress"
+        return self._run_object(run_id, state)
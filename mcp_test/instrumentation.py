@@ -0,0 +1,226 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Arquivos de exportação (vazios = não exportar)
+METRICS_FILE = os.getenv("ASSISTANT_METRICS_FILE", "")
+TRACE_FILE = os.getenv("ASSISTANT_TRACE_FILE", "")
+
+# Limites dos histogramas
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Spans finalizados mantidos em memória até a próxima exportação
+MAX_PENDING_SPANS = 10000
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "OK"
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class Tracer:
+    """Registra spans aninhados; o span atual é mantido por thread."""
+
+    def __init__(self):
+        self.finished = deque(maxlen=MAX_PENDING_SPANS)
+        self._local = threading.local()
+
+    def current(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """Abre um span filho do span atual (ou de `parent`, em outra thread)."""
+        parent = parent or self.current()
+        trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "ERROR"
+            span.set("error", repr(e))
+            raise
+        finally:
+            stack.pop()
+            span.end_ns = time.time_ns()
+            self.finished.append(span)
+            metrics.observe("span_duration_seconds", span.duration, DURATION_BUCKETS, span=name)
+
+    def drain(self):
+        spans = []
+        while self.finished:
+            spans.append(self.finished.popleft())
+        return spans
+
+
+class Metrics:
+    """Contadores e histogramas com labels, no modelo do Prometheus."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=SIZE_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                dict(self.counters),
+                {key: dict(h, counts=list(h["counts"])) for key, h in self.histograms.items()},
+            )
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class PrometheusExporter:
+    """Grava as métricas no formato texto do Prometheus (sobrescreve o arquivo)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, spans, counters, histograms):
+        lines = []
+        for name in sorted({key[0] for key in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        for name in sorted({key[0] for key in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), h in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(h["buckets"], h["counts"]):
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {h['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {h['sum']}")
+                lines.append(f"{name}_count{_labels(labels)} {h['count']}")
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class OTLPJsonExporter:
+    """Acrescenta os spans ao arquivo em JSON compatível com OTLP (uma linha por exportação)."""
+
+    def __init__(self, path, service_name="k8s-assistant"):
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans, counters, histograms):
+        if not spans:
+            return
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "k8s_assistant"},
+                "spans": [self._span(span) for span in spans],
+            }],
+        }]}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(document) + "\n")
+
+    @staticmethod
+    def _span(span):
+        data = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in span.attributes.items()],
+            "status": {"code": 2 if span.status == "ERROR" else 1},
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        return data
+
+
+tracer = Tracer()
+metrics = Metrics()
+_exporters = []
+
+
+def add_exporter(exporter):
+    """Registra um exportador (qualquer objeto com export(spans, counters, histograms))."""
+    _exporters.append(exporter)
+
+
+def set_exporters(exporters):
+    _exporters[:] = list(exporters)
+
+
+def flush():
+    """Envia os spans pendentes e o estado atual das métricas aos exportadores."""
+    if not _exporters:
+        return
+    spans = tracer.drain()
+    counters, histograms = metrics.snapshot()
+    for exporter in _exporters:
+        try:
+            exporter.export(spans, counters, histograms)
+        except OSError as e:
+            print(f"Erro ao exportar métricas: {e}")
+
+
+# Atalhos usados pelo restante do código
+span = tracer.span
+inc = metrics.inc
+observe = metrics.observe
+
+if METRICS_FILE:
+    add_exporter(PrometheusExporter(METRICS_FILE))
+if TRACE_FILE:
+    add_exporter(OTLPJsonExporter(TRACE_FILE))
@@ -1,222 +1,389 @@
 import os
 import time
 import json
-import requests
-import openai
+from startup import LazyModule, in_background, profile
 from dotenv import load_dotenv
+from aggregation import aggregate_response
+from apply_pipeline import affected_resources, apply_manifests, response_succeeded, unchanged_response
+from assistant_registry import get_or_create_assistant
+import cassette as cassettes
+from circuit_breaker import HealthManager
+from compaction import compact_if_needed
+import instrumentation
+from manifest_store import ManifestStore
+from manifests import manifest_key, normalize_resource_type, object_key, parse_manifests
+from mcp_client import get_client
+from mcp_queue import BackpressureError, RequestQueue
+import projection
+from resource_cache import ResourceCache
+from resource_index import ResourceInformer
+from simulation import is_simulated, simulated_response
+import table_encoding
+from streaming_json import ItemStream, should_stream
+from single_flight import COALESCED_ENDPOINTS, SingleFlight, request_key
+from tool_dispatcher import dispatch_tool_calls, object_lock
+from tools_schema import ASSISTANT_MODEL, KUBERNETES_TOOLS
+from transcript import get_transcript
+profile.mark("importação dos módulos")
+
+# A biblioteca da OpenAI é pesada: importada só no primeiro uso (em segundo plano, na inicialização)
+openai = LazyModule("openai")
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Configurar a API key da OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# A biblioteca da OpenAI lê a chave de OPENAI_API_KEY (carregada do .env)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # URL do MCP Server
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080")
 
-# Flag para indicar se devemos usar simulação local
-USE_SIMULATION = False
+# Flag para forçar o uso da simulação local (sem consultar o MCP Server)
+USE_SIMULATION = os.getenv("MCP_FORCE_SIMULATION", "0") == "1"
+
+# Usar streaming de eventos do run (com polling adaptativo como fallback)
+USE_STREAMING = os.getenv("ASSISTANT_STREAMING", "1") == "1"
+
+# Exibir tempo até o primeiro token e latência total de cada turno
+SHOW_TIMINGS = os.getenv("ASSISTANT_SHOW_TIMINGS", "1") == "1"
+
+# Cache local das respostas de getKubernetesResources
+USE_CACHE = os.getenv("MCP_CACHE_ENABLED", "1") == "1"
+resource_cache = ResourceCache()
+
+# Consultas idênticas em andamento compartilham uma única requisição ao MCP Server
+USE_COALESCING = os.getenv("MCP_COALESCE_ENABLED", "1") == "1"
+mcp_flights = SingleFlight()
+
+# Fila limitada, com prioridade e limite de taxa, para as requisições ao MCP Server
+USE_QUEUE = os.getenv("MCP_QUEUE_ENABLED", "1") == "1"
+mcp_queue = RequestQueue()
+
+# Respostas grandes de tools/get lidas em streaming, item a item (ver MCP_STREAM_MIN_BYTES)
+USE_STREAM_PARSING = os.getenv("MCP_STREAM_PARSE", "1") == "1"
+
+# Projeção das respostas (campos principais, seletores e orçamento de tamanho)
+USE_PROJECTION = os.getenv("MCP_PROJECTION_ENABLED", "1") == "1"
+
+# Formato padrão da saída de getKubernetesResources (json ou table)
+OUTPUT_FORMAT = os.getenv("MCP_OUTPUT_FORMAT", "json")
+
+# Índice local de recursos (informer) alimentado pelo MCP Server
+USE_INFORMER = os.getenv("MCP_INFORMER_ENABLED", "0") == "1"
+INFORMER_NAMESPACE = os.getenv("MCP_INFORMER_NAMESPACE", "all")
+informer = None
+
+# Últimos manifestos aplicados, para evitar applies sem alterações
+USE_MANIFEST_STORE = os.getenv("MCP_SKIP_UNCHANGED", "1") == "1"
+manifest_store = ManifestStore()
+
+# Compactação automática de threads longas (ver ASSISTANT_COMPACT_THRESHOLD)
+USE_COMPACTION = os.getenv("ASSISTANT_COMPACTION", "1") == "1"
+
+# Gravação/reprodução das chamadas (ver ASSISTANT_CASSETTE), ativada na inicialização
+cassette = None
+
+# Intervalos do polling adaptativo (segundos)
+POLL_MIN_INTERVAL = float(os.getenv("ASSISTANT_POLL_MIN", "0.1"))
+POLL_MAX_INTERVAL = float(os.getenv("ASSISTANT_POLL_MAX", "2.0"))
 
 # Verificar se a chave está presente
-if not openai.api_key:
+if not OPENAI_API_KEY:
     raise ValueError("A chave da API da OpenAI não foi encontrada. Verifique o arquivo .env")
 
-# Criar um novo Assistant (só precisa ser feito uma vez)
-def create_assistant():
-    assistant = openai.beta.assistants.create(
-        name="Kubernetes Assistant",
-        instructions="""
+# Instruções do assistant
+ASSISTANT_INSTRUCTIONS = """
         Você é um assistente especializado em gerenciar clusters Kubernetes. 
         Use a ferramenta applyKubernetesConfig para aplicar configurações YAML no cluster.
         Use a ferramenta getKubernetesResources para obter informações sobre recursos do cluster.
+        Para contagens, resumos por namespace/fase/node e prontidão de deployments, use
+        aggregateKubernetesResources em vez de listar todos os recursos.
         Forneça respostas claras e concisas sobre o estado dos recursos Kubernetes.
-        """,
-        model="gpt-4o",
-        tools=[
-            {
-                "type": "function",
-                "function": {
-                    "name": "applyKubernetesConfig",
-                    "description": "Aplica uma configuração YAML no cluster Kubernetes",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "config": {
-                                "type": "string",
-                                "description": "YAML ou JSON contendo a configuração Kubernetes a ser aplicada"
-                            }
-                        },
-                        "required": ["config"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "getKubernetesResources",
-                    "description": "Obtém recursos Kubernetes do cluster",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "resourceType": {
-                                "type": "string",
-                                "description": "Tipo de recurso Kubernetes (pods, deployments, services, etc.)"
-                            },
-                            "namespace": {
-                                "type": "string",
-                                "description": "Namespace dos recursos (padrão: default)"
-                            }
-                        },
-                        "required": ["resourceType"]
-                    }
-                }
-            }
-        ]
+        """
+
+# Exibir as mudanças de estado da conexão com o MCP Server
+def report_health_change(breaker, previous, state):
+    if breaker.name == "health" and state == "open":
+        print(f"\nAVISO: MCP Server indisponível em {MCP_SERVER_URL}; usando simulação local até ele voltar")
+    elif breaker.name == "health" and state == "closed" and previous != "closed":
+        print(f"\nMCP Server disponível novamente em {MCP_SERVER_URL}")
+    elif state == "open":
+        print(f"\nAVISO: falhas repetidas em {breaker.name}; usando simulação local por {breaker.reset_timeout:.0f}s")
+
+# Estado de saúde do MCP Server (health check em segundo plano e circuit breakers)
+mcp_health = HealthManager(
+    lambda timeout: get_client(MCP_SERVER_URL).health(timeout=timeout),
+    on_change=report_health_change
+)
+
+# Obter o Assistant registrado localmente (criado apenas na primeira execução
+# ou atualizado quando instruções, ferramentas ou modelo mudam)
+def create_assistant():
+    return get_or_create_assistant(
+        name="Kubernetes Assistant",
+        instructions=ASSISTANT_INSTRUCTIONS,
+        tools=KUBERNETES_TOOLS,
+        model=ASSISTANT_MODEL
     )
-    return assistant.id
 
 # Função para se comunicar com o MCP Server
-def call_mcp_server(endpoint, payload):
-    if USE_SIMULATION:
-        return simulate_mcp_response(endpoint, payload)
-    
-    url = f"{MCP_SERVER_URL}/v1/{endpoint}"
+# (com stream=True, respostas grandes voltam como ItemStream, lido por quem chamou)
+def call_mcp_server(endpoint, payload, stream=False):
+    # Um ItemStream só pode ser lido uma vez: com outras chamadas aguardando, a
+    # lista é montada uma única vez e compartilhada
+    if USE_COALESCING and endpoint in COALESCED_ENDPOINTS:
+        return mcp_flights.do(request_key(endpoint, payload),
+                              lambda: _enqueue_mcp_call(endpoint, payload, stream),
+                              share=_materialize_response, tag=payload)
+    return _enqueue_mcp_call(endpoint, payload, stream)
+
+def _materialize_response(mcp_response):
+    if not isinstance(mcp_response, ItemStream):
+        return mcp_response
+    return read_mcp_response(mcp_response, ItemStream.to_response)
+
+# Passar a requisição pela fila; com o servidor sobrecarregado, o modelo é avisado para tentar depois
+def _enqueue_mcp_call(endpoint, payload, stream=False):
+    if not USE_QUEUE or USE_SIMULATION:
+        return _call_mcp_server(endpoint, payload, stream)
     try:
-        response = requests.post(url, json=payload)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Erro na chamada do MCP Server: {response.status_code}")
-            print(f"Resposta: {response.text}")
-            return {"error": f"Erro na chamada do MCP Server: {response.status_code}"}
-    except Exception as e:
-        print(f"Exceção ao chamar o MCP Server: {e}")
-        print("Usando simulação local como fallback...")
-        return simulate_mcp_response(endpoint, payload)
-
-# Função para simular respostas do MCP Server
-def simulate_mcp_response(endpoint, payload):
-    if endpoint == "tools/get":
-        resource_type = payload.get("resourceType", "")
-        namespace = payload.get("namespace", "default")
+        return mcp_queue.run(endpoint, lambda: _call_mcp_server(endpoint, payload, stream))
+    except BackpressureError as e:
+        return {
+            "error": f"{e}. Aguarde e tente novamente; prefira aplicar várias alterações em um único manifesto.",
+            "backpressure": True,
+            "retryAfter": e.retry_after
+        }
+
+def _call_mcp_server(endpoint, payload, stream=False):
+    with instrumentation.span("mcp_request", endpoint=endpoint) as span:
+        if USE_SIMULATION:
+            span.set("simulation", True)
+            instrumentation.inc("mcp_simulated_requests_total", endpoint=endpoint)
+            return simulated_response(endpoint, payload)
         
-        # Simular diferentes tipos de recursos
-        if resource_type.lower() == "pods":
-            return {
-                "items": [
-                    {"metadata": {"name": "nginx-pod"}, "status": {"phase": "Running"}},
-                    {"metadata": {"name": "app-backend"}, "status": {"phase": "Running"}},
-                    {"metadata": {"name": "coredns-1"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "coredns-2"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "etcd"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "kube-apiserver"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "kube-controller-manager"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "kube-scheduler"}, "namespace": "kube-system", "status": {"phase": "Running"}},
-                    {"metadata": {"name": "kube-proxy"}, "namespace": "kube-system", "status": {"phase": "Running"}}
-                ]
-            }
-        elif resource_type.lower() == "deployments":
-            return {
-                "items": [
-                    {"metadata": {"name": "nginx-deployment"}, "spec": {"replicas": 3}, "status": {"readyReplicas": 3}},
-                    {"metadata": {"name": "app-deployment"}, "spec": {"replicas": 2}, "status": {"readyReplicas": 2}}
-                ]
-            }
-        elif resource_type.lower() == "services":
-            return {
-                "items": [
-                    {"metadata": {"name": "kubernetes"}, "spec": {"type": "ClusterIP", "clusterIP": "10.96.0.1"}},
-                    {"metadata": {"name": "nginx-service"}, "spec": {"type": "ClusterIP", "clusterIP": "10.96.0.100"}}
-                ]
-            }
-        elif resource_type.lower() == "nodes":
-            return {
-                "items": [
-                    {"metadata": {"name": "kind-control-plane"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]}}
-                ]
-            }
-        elif resource_type.lower() == "namespaces":
-            return {
-                "items": [
-                    {"metadata": {"name": "default"}},
-                    {"metadata": {"name": "kube-system"}},
-                    {"metadata": {"name": "kube-public"}},
-                    {"metadata": {"name": "kube-node-lease"}}
-                ]
-            }
-        else:
-            return {"items": []}
-            
-    elif endpoint == "tools/apply":
-        config = payload.get("config", "")
+        # Com o servidor fora do ar (ou o endpoint falhando), usar a simulação sem esperar timeouts
+        breaker = mcp_health.breaker(endpoint)
+        if not mcp_health.available() or not breaker.allow_request():
+            span.set("fallback", "circuit_open")
+            instrumentation.inc("mcp_simulation_fallbacks_total", endpoint=endpoint, reason="circuit_open")
+            return simulated_response(endpoint, payload)
         
-        # Verificar tipo de recurso no YAML
-        resource_type = "desconhecido"
-        if "kind: Deployment" in config:
-            resource_type = "Deployment"
-        elif "kind: Pod" in config:
-            resource_type = "Pod"
-        elif "kind: Service" in config:
-            resource_type = "Service"
+        try:
+            response = get_client(MCP_SERVER_URL).post(endpoint, payload, stream=stream)
+            span.set("status_code", response.status_code)
+            instrumentation.inc("mcp_requests_total", endpoint=endpoint, status=response.status_code)
+            # Tentativas extras feitas pelo Retry do urllib3 nesta requisição
+            retries = getattr(response.raw, "retries", None)
+            if retries is not None and retries.history:
+                instrumentation.inc("mcp_retries_total", len(retries.history), endpoint=endpoint)
             
-        # Extrair nome do recurso
-        import re
-        name_match = re.search(r"name:\s*([a-zA-Z0-9-]+)", config)
-        resource_name = name_match.group(1) if name_match else "recurso"
-        
-        return {
-            "status": "success", 
-            "message": f"{resource_type} '{resource_name}' aplicado com sucesso",
-            "resource": {"kind": resource_type, "name": resource_name}
-        }
+            # Erros 5xx indicam degradação do servidor; 4xx são erros da requisição
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            
+            if response.status_code == 200 and stream and should_stream(response):
+                # O corpo é lido depois, item a item, por quem fez a chamada
+                span.set("streamed", True)
+                instrumentation.inc("mcp_streamed_responses_total", endpoint=endpoint)
+                return ItemStream.from_response(response)
+            
+            instrumentation.observe("mcp_response_bytes", len(response.content), endpoint=endpoint)
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"Erro na chamada do MCP Server: {response.status_code}")
+                print(f"Resposta: {response.text}")
+                return {"error": f"Erro na chamada do MCP Server: {response.status_code}"}
+        except Exception as e:
+            breaker.record_failure()
+            print(f"Exceção ao chamar o MCP Server: {e}")
+            print("Usando simulação local como fallback...")
+            span.set("fallback", repr(e))
+            instrumentation.inc("mcp_simulation_fallbacks_total", endpoint=endpoint, reason="exception")
+            return simulated_response(endpoint, payload)
+
+# Consumir uma resposta (dicionário ou ItemStream); falhas no meio do streaming viram um erro para o modelo
+def read_mcp_response(mcp_response, consume):
+    if not isinstance(mcp_response, ItemStream):
+        return consume(mcp_response)
+    try:
+        return consume(mcp_response)
+    except (OSError, ValueError) as e:
+        mcp_health.breaker("tools/get").record_failure()
+        print(f"Exceção ao ler a resposta do MCP Server: {e}")
+        return {"error": f"Falha ao ler a resposta do MCP Server: {e}"}
+    finally:
+        mcp_response.close()
+        instrumentation.observe("mcp_response_bytes", mcp_response.bytes_read, endpoint="tools/get")
+
+# Obter recursos do cluster, passando pelo cache local
+# (com stream=True, listas grandes vêm do MCP Server como ItemStream e não são guardadas no cache,
+# exceto quando a lista precisou ser montada para ser compartilhada entre chamadas idênticas)
+def get_kubernetes_resources(resource_type, namespace="default", stream=False):
+    # Com o informer sincronizado, a consulta é uma busca no índice local; uma
+    # ressincronização pedida por um apply pode remover o índice a qualquer momento,
+    # então o resultado de list() é usado diretamente (None = seguir pelo cache/MCP Server)
+    if informer is not None:
+        indexed = informer.list(resource_type, namespace)
+        if indexed is not None:
+            return indexed
+    
+    if USE_CACHE:
+        cached = resource_cache.get(resource_type, namespace)
+        if cached is not None:
+            return cached
+        # Um apply concluído durante a consulta invalida a chave; a resposta antiga não é guardada
+        generation = resource_cache.generation(resource_type, namespace)
     
-    return {"status": "error", "message": "Função não suportada na simulação"}
+    mcp_response = call_mcp_server("tools/get", {
+        "resourceType": resource_type,
+        "namespace": namespace
+    }, stream=stream)
+    
+    # Respostas de erro e simuladas (MCP Server fora do ar) não são armazenadas
+    if USE_CACHE and isinstance(mcp_response, dict) and "error" not in mcp_response and not is_simulated(mcp_response):
+        resource_cache.put(resource_type, namespace, mcp_response, generation)
+    return mcp_response
 
-# Função para processar as chamadas de função
-def process_tool_calls(run, thread_id):
-    tool_outputs = []
+# Aplicar uma configuração (um ou vários objetos)
+def apply_kubernetes_config(config, force=False):
+    # Configurações com vários objetos são divididas, ordenadas por dependência
+    # e aplicadas em paralelo; cada objeto passa por apply_single_object
+    return apply_manifests(config, lambda single: apply_single_object(single, force))
+
+# Aplicar um único objeto e invalidar os dados locais dos recursos afetados
+def apply_single_object(config, force=False):
+    try:
+        objects = parse_manifests(config)
+    except ValueError:
+        objects = []
+    obj = objects[0] if len(objects) == 1 else None
     
-    # Para cada chamada de ferramenta
-    for tool_call in run.required_action.submit_tool_outputs.tool_calls:
-        # Pegar o nome da função e os argumentos
-        function_name = tool_call.function.name
-        function_args = tool_call.function.arguments
+    # Applies no mesmo objeto (inclusive vindos de manifestos diferentes) não correm em paralelo
+    with object_lock(manifest_key(obj) if obj is not None else object_key(config)):
+        return _apply_locked(config, obj, force)
+
+# Aplicar um objeto (com o lock do objeto já adquirido)
+def _apply_locked(config, obj, force):
+    # Objetos idênticos ao último apply não são reenviados ao MCP Server
+    changes = None
+    if obj is not None and USE_MANIFEST_STORE:
+        unchanged, changes = manifest_store.check(obj)
+        if unchanged and not force:
+            return unchanged_response(obj)
+    
+    mcp_response = call_mcp_server("tools/apply", {
+        "config": config
+    })
+    
+    if response_succeeded(mcp_response):
+        # Um apply simulado não chegou ao cluster: o objeto não é registrado como aplicado
+        if obj is not None and USE_MANIFEST_STORE and not is_simulated(mcp_response):
+            manifest_store.record(obj)
+            # Devolver ao modelo um resumo compacto do que mudou
+            if changes:
+                mcp_response = dict(mcp_response, changes=changes)
+        
+        # Workloads também invalidam os pods do namespace; tipos sem namespace, todas as chaves
+        for resource_type, scope in affected_resources(config):
+            if USE_CACHE:
+                resource_cache.invalidate(resource_type, scope)
+            # Consultas iniciadas antes do apply não são mais compartilhadas com quem chegar depois
+            mcp_flights.forget(lambda payload: reads_resources(payload, resource_type, scope))
+            if informer is not None:
+                informer.request_resync(resource_type)
+    return mcp_response
+
+# Se um payload de tools/get lê recursos do tipo/namespace (None = todos os namespaces) afetados
+def reads_resources(payload, resource_type, namespace):
+    if normalize_resource_type(payload.get("resourceType")) != normalize_resource_type(resource_type):
+        return False
+    return namespace is None or payload.get("namespace", "default") in (namespace, "all")
+
+# Iniciar o informer que mantém o índice local de recursos
+def start_informer():
+    global informer
+    informer = ResourceInformer(
+        lambda resource_type: call_mcp_server("tools/get", {
+            "resourceType": resource_type,
+            "namespace": INFORMER_NAMESPACE
+        }),
+        namespace=INFORMER_NAMESPACE
+    ).start()
+    return informer
+
+# Função para executar uma única chamada de ferramenta
+def execute_tool_call(function_name, args):
+    # Definimos os resultados como uma string vazia por padrão
+    result = ""
+    
+    # Interação real ou simulada com o MCP Server
+    if function_name == "getKubernetesResources":
+        resource_type = args.get("resourceType")
+        namespace = args.get("namespace", "default")
         
-        args = json.loads(function_args)
+        # Obter recursos (do cache local ou do MCP Server); listas grandes são
+        # lidas em streaming e projetadas item a item
+        mcp_response = get_kubernetes_resources(resource_type, namespace, stream=USE_STREAM_PARSING and USE_PROJECTION)
         
-        # Definimos os resultados como uma string vazia por padrão
-        result = ""
+        # Reduzir a resposta antes de enviá-la ao modelo
+        if USE_PROJECTION:
+            mcp_response = read_mcp_response(mcp_response, lambda response: projection.project_response(
+                resource_type,
+                response,
+                label_selector=args.get("labelSelector"),
+                field_selector=args.get("fieldSelector"),
+                fields=args.get("fields"),
+                offset=args.get("offset", 0)
+            )[0])
         
-        # Interação real ou simulada com o MCP Server
-        if function_name == "getKubernetesResources":
-            resource_type = args.get("resourceType")
-            namespace = args.get("namespace", "default")
-            
-            # Chamar o MCP Server para obter recursos
-            mcp_response = call_mcp_server("tools/get", {
-                "resourceType": resource_type,
-                "namespace": namespace
-            })
-            
-            # Converter a resposta para string JSON
-            result = json.dumps(mcp_response)
-                
-        elif function_name == "applyKubernetesConfig":
-            config = args.get("config")
+        # Converter a resposta para string JSON (objetos ou tabela compacta)
+        output_format = args.get("outputFormat") or OUTPUT_FORMAT
+        if output_format not in table_encoding.OUTPUT_FORMATS:
+            output_format = "json"
+        result = table_encoding.dumps(mcp_response, output_format)
             
-            # Chamar o MCP Server para aplicar a configuração
-            mcp_response = call_mcp_server("tools/apply", {
-                "config": config
-            })
-            
-            # Converter a resposta para string JSON
-            result = json.dumps(mcp_response)
+    elif function_name == "aggregateKubernetesResources":
+        resource_type = args.get("resourceType")
+        
+        # Agregação local sobre o informer/cache: apenas o resultado vai para o modelo
+        mcp_response = get_kubernetes_resources(resource_type, args.get("namespace", "all"), stream=USE_STREAM_PARSING)
+        result = json.dumps(read_mcp_response(mcp_response, lambda response: aggregate_response(
+            resource_type,
+            response,
+            group_by=args.get("groupBy"),
+            metric=args.get("metric", "count"),
+            top_n=args.get("topN"),
+            label_selector=args.get("labelSelector"),
+            field_selector=args.get("fieldSelector")
+        )))
+    
+    elif function_name == "applyKubernetesConfig":
+        config = args.get("config")
         
-        # Adicionar o resultado à lista de saídas
-        tool_outputs.append({
-            "tool_call_id": tool_call.id,
-            "output": result
-        })
+        # Chamar o MCP Server para aplicar a configuração
+        mcp_response = apply_kubernetes_config(config, force=args.get("force", False))
+        
+        # Converter a resposta para string JSON
+        result = json.dumps(mcp_response)
+    
+    return result
+
+# Função para executar as chamadas de ferramenta de um run
+def collect_tool_outputs(run):
+    # Executar as chamadas em paralelo, preservando a ordem dos tool_call_id
+    return dispatch_tool_calls(
+        run.required_action.submit_tool_outputs.tool_calls,
+        execute_tool_call
+    )
+
+# Função para processar as chamadas de função
+def process_tool_calls(run, thread_id):
+    tool_outputs = collect_tool_outputs(run)
+    get_transcript(thread_id).record_tool_outputs(tool_outputs)
     
     # Submeter todas as saídas de ferramentas
     openai.beta.threads.runs.submit_tool_outputs(
@@ -225,88 +392,252 @@ def process_tool_calls(run, thread_id):
         tool_outputs=tool_outputs
     )
 
-# Função principal para executar o chat
-def chat_with_assistant():
-    global USE_SIMULATION
+# Medição de latência de um turno
+class TurnMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token = None
+        self.end = None
     
-    # Verificar conexão com o MCP Server
-    try:
-        response = requests.get(f"{MCP_SERVER_URL}/v1/health")
-        if response.status_code != 200:
-            print(f"AVISO: O MCP Server não está respondendo corretamente em {MCP_SERVER_URL}")
-            print(f"Status: {response.status_code}")
-            print("Usando simulação local...")
-            USE_SIMULATION = True
-    except Exception as e:
-        print(f"AVISO: Não foi possível conectar ao MCP Server em {MCP_SERVER_URL}")
-        print(f"Erro: {e}")
-        print("Usando simulação local...")
-        USE_SIMULATION = True
+    def mark_first_token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+    
+    def finish(self):
+        self.end = time.perf_counter()
+        instrumentation.observe("turn_seconds", self.end - self.start, instrumentation.DURATION_BUCKETS)
+        if self.first_token is not None:
+            instrumentation.observe(
+                "time_to_first_token_seconds",
+                self.first_token - self.start,
+                instrumentation.DURATION_BUCKETS
+            )
+    
+    def report(self):
+        ttft = f"{self.first_token - self.start:.2f}s" if self.first_token else "n/d"
+        print(f"\n[tempo] primeiro token: {ttft} | turno completo: {self.end - self.start:.2f}s")
+
+# Executar o run via streaming, imprimindo os tokens conforme chegam
+def stream_run(thread_id, assistant_id, metrics):
+    text = []
+    manager = openai.beta.threads.runs.stream(
+        thread_id=thread_id,
+        assistant_id=assistant_id
+    )
     
-    # Criar ou usar um assistant existente
-    assistant_id = create_assistant()
-    print(f"Assistant ID: {assistant_id}")
+    while manager is not None:
+        pending = None
+        with manager as stream:
+            for event in stream:
+                if event.event == "thread.message.delta":
+                    for part in event.data.delta.content or []:
+                        if part.type == "text" and part.text and part.text.value:
+                            if metrics.first_token is None:
+                                print("\nAssistant: ", end="", flush=True)
+                            metrics.mark_first_token()
+                            print(part.text.value, end="", flush=True)
+                            text.append(part.text.value)
+                
+                elif event.event == "thread.message.completed":
+                    # Manter a transcrição local sem precisar listar a thread depois
+                    get_transcript(thread_id).record(event.data)
+                
+                elif event.event == "thread.run.requires_action":
+                    # O assistant está solicitando informações
+                    tool_outputs = collect_tool_outputs(event.data)
+                    get_transcript(thread_id).record_tool_outputs(tool_outputs)
+                    pending = (event.data.id, tool_outputs)
+                
+                elif event.event in ["thread.run.failed", "thread.run.cancelled", "thread.run.expired"]:
+                    print(f"\nErro: A execução falhou com status: {event.data.status}")
+                    if event.data.last_error:
+                        print(f"Detalhes: {event.data.last_error}")
+        
+        # O stream termina quando o run pausa em requires_action; continuar com as saídas
+        manager = None
+        if pending:
+            run_id, tool_outputs = pending
+            manager = openai.beta.threads.runs.submit_tool_outputs_stream(
+                thread_id=thread_id,
+                run_id=run_id,
+                tool_outputs=tool_outputs
+            )
     
-    # Criar uma nova thread
-    thread = openai.beta.threads.create()
-    print(f"Thread criada com ID: {thread.id}")
+    if text:
+        print()
+    return "".join(text)
+
+# Executar o run via polling, com intervalo crescente enquanto o run está em andamento
+def poll_run(thread_id, assistant_id, metrics):
+    run = openai.beta.threads.runs.create(
+        thread_id=thread_id,
+        assistant_id=assistant_id
+    )
+    
+    delay = POLL_MIN_INTERVAL
+    while True:
+        with instrumentation.span("poll", run_id=run.id) as span:
+            run = openai.beta.threads.runs.retrieve(
+                thread_id=thread_id,
+                run_id=run.id
+            )
+            span.set("status", run.status)
+        instrumentation.inc("run_polls_total", status=run.status)
+        
+        if run.status == "completed":
+            # Buscar apenas as mensagens novas geradas por este run
+            new_messages = get_transcript(thread_id).fetch_new(openai.beta.threads, run_id=run.id)
+            assistant_message = "\n\n".join(
+                entry["text"] for entry in new_messages if entry["role"] == "assistant"
+            )
+            metrics.mark_first_token()
+            print(f"\nAssistant: {assistant_message}")
+            return assistant_message
+        
+        elif run.status == "requires_action":
+            # O assistant está solicitando informações
+            process_tool_calls(run, thread_id)
+            # Após submeter as saídas, voltar a verificar rapidamente
+            delay = POLL_MIN_INTERVAL
+            continue
+        
+        elif run.status in ["failed", "cancelled", "expired"]:
+            print(f"\nErro: A execução falhou com status: {run.status}")
+            if hasattr(run, 'last_error'):
+                print(f"Detalhes: {run.last_error}")
+            return ""
+        
+        # Aguardar antes de verificar novamente
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_INTERVAL)
+
+# Executar um turno completo da conversa
+def run_turn(thread_id, assistant_id, user_input):
+    global USE_STREAMING
+    
+    metrics = TurnMetrics()
+    
+    # Adicionar a mensagem à thread
+    message = openai.beta.threads.messages.create(
+        thread_id=thread_id,
+        role="user",
+        content=user_input
+    )
+    get_transcript(thread_id).record(message)
+    
+    # Versões antigas da biblioteca openai não suportam streaming de runs
+    if USE_STREAMING and not hasattr(openai.beta.threads.runs, "stream"):
+        print("AVISO: streaming de runs indisponível, usando polling...")
+        USE_STREAMING = False
+    
+    with instrumentation.span("run", thread_id=thread_id, mode="streaming" if USE_STREAMING else "polling"):
+        if USE_STREAMING:
+            answer = stream_run(thread_id, assistant_id, metrics)
+        else:
+            answer = poll_run(thread_id, assistant_id, metrics)
+    
+    metrics.finish()
+    if SHOW_TIMINGS:
+        metrics.report()
+    instrumentation.flush()
+    return answer
+
+# Verificar o MCP Server (e continuar monitorando em segundo plano) e iniciar o informer
+def start_mcp_monitoring():
+    if not USE_SIMULATION:
+        mcp_health.check()
+        mcp_health.start()
+    
+    if USE_INFORMER:
+        start_informer()
+
+# Obter o assistant e, opcionalmente, criar a thread da conversa
+def prepare_assistant(create_thread=True):
+    with profile.phase("busca do assistant"):
+        assistant_id = create_assistant()
+    thread_id = None
+    if create_thread:
+        with profile.phase("criação da thread"):
+            thread_id = openai.beta.threads.create().id
+    return assistant_id, thread_id
+
+# Passar as chamadas à OpenAI e ao MCP Server pela gravação configurada, se houver
+def start_cassette():
+    global cassette
+    if cassettes.CASSETTE_PATH and cassette is None:
+        cassette = cassettes.install(openai, get_client(MCP_SERVER_URL))
+        print(f"Gravação ({cassette.mode}): {cassette.path}")
+    return cassette
+
+# Iniciar em paralelo, em segundo plano, a verificação do MCP Server e a preparação do assistant
+def begin_startup(create_thread=True):
+    start_cassette()
+    monitoring = in_background(start_mcp_monitoring, "health check do MCP Server")
+    assistant = in_background(prepare_assistant, "preparação do assistant", create_thread)
+    return monitoring, assistant
+
+# Preparar o ambiente (MCP Server, informer e assistant) e retornar o ID do assistant
+def start_assistant():
+    monitoring, assistant = begin_startup(create_thread=False)
+    monitoring.result()
+    return assistant.result()[0]
+
+# Função principal para executar o chat
+def chat_with_assistant(profile_startup=False):
+    # O prompt aparece imediatamente; a rede é preparada enquanto o usuário digita
+    monitoring, assistant = begin_startup()
+    assistant_id = thread_id = None
     
     print("\n=== Kubernetes Assistant ===")
     if USE_SIMULATION:
         print("MODO DE SIMULAÇÃO: Usando dados simulados do Kubernetes")
     print("Digite suas mensagens (digite 'sair' para encerrar):")
+    profile.mark("tempo até o prompt")
     
     while True:
         # Obter mensagem do usuário
         user_input = input("\nVocê: ")
         
         if user_input.lower() == 'sair':
+            if USE_CACHE:
+                print(f"Cache de recursos: {resource_cache.stats()}")
+            if USE_COALESCING:
+                print(f"Requisições compartilhadas: {mcp_flights.stats()}")
+            if USE_QUEUE:
+                print(f"Fila do MCP Server: {mcp_queue.stats()}")
+            if USE_PROJECTION:
+                print(f"Projeção das respostas: {projection.stats.summary()}")
+            if USE_MANIFEST_STORE:
+                print(f"Applies sem alterações detectados: {manifest_store.unchanged}")
+            if not USE_SIMULATION:
+                mcp_health.stop()
+                print(f"Estado do MCP Server: {mcp_health.stats()}")
+            if cassette is not None:
+                print(f"Gravação: {cassette.stats()}")
+            if profile_startup:
+                print(profile.report())
             print("Encerrando o chat...")
             break
         
-        # Adicionar a mensagem à thread
-        openai.beta.threads.messages.create(
-            thread_id=thread.id,
-            role="user",
-            content=user_input
-        )
+        # No primeiro turno, aguardar a preparação iniciada em segundo plano (em geral já concluída)
+        if assistant_id is None:
+            assistant_id, thread_id = assistant.result()
+            print(f"Assistant ID: {assistant_id} | Thread: {thread_id}")
+            if not monitoring.done():
+                print("Aguardando o health check do MCP Server...")
+            monitoring.result()
         
-        # Executar o assistant
-        run = openai.beta.threads.runs.create(
-            thread_id=thread.id,
-            assistant_id=assistant_id
-        )
+        run_turn(thread_id, assistant_id, user_input)
         
-        # Verificar o status do run
-        while True:
-            run = openai.beta.threads.runs.retrieve(
-                thread_id=thread.id,
-                run_id=run.id
-            )
-            
-            if run.status == "completed":
-                # Exibir a resposta do assistant
-                messages = openai.beta.threads.messages.list(
-                    thread_id=thread.id
-                )
-                
-                # A primeira mensagem é a mais recente
-                assistant_message = messages.data[0].content[0].text.value
-                print(f"\nAssistant: {assistant_message}")
-                break
-            
-            elif run.status == "requires_action":
-                # O assistant está solicitando informações
-                process_tool_calls(run, thread.id)
-            
-            elif run.status in ["failed", "cancelled", "expired"]:
-                print(f"\nErro: A execução falhou com status: {run.status}")
-                if hasattr(run, 'last_error'):
-                    print(f"Detalhes: {run.last_error}")
-                break
-            
-            # Aguardar antes de verificar novamente
-            time.sleep(1)
+        # Em sessões longas, continuar em uma thread nova com um resumo do contexto
+        if USE_COMPACTION:
+            thread_id = compact_if_needed(openai, thread_id, get_kubernetes_resources)
 
 if __name__ == "__main__":
-    chat_with_assistant() 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Assistente de Kubernetes com a API de Assistants da OpenAI")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Exibir ao sair o tempo de cada etapa da inicialização")
+    args = parser.parse_args()
+    chat_with_assistant(profile_startup=args.profile_startup) 
\ No newline at end of file
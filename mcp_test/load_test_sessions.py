@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from async_sessions import AsyncSessionEngine
+from k8s_assistant import create_assistant
+
+DEFAULT_PROMPTS = [
+    "Liste todos os pods no namespace default",
+    "Quais namespaces existem no cluster?",
+]
+
+
+async def load_test(assistant_id, sessions, concurrency, prompts, simulation):
+    engine = AsyncSessionEngine(assistant_id, max_sessions=concurrency, force_simulation=simulation)
+    start = time.perf_counter()
+    try:
+        results = await engine.run_many([prompts] * sessions)
+    finally:
+        await engine.close()
+    queue = engine.mcp.queue.stats() if engine.mcp.queue else None
+    return results, time.perf_counter() - start, engine.mcp.flights.stats(), queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do motor de sessões assíncrono")
+    parser.add_argument("--sessions", type=int, default=10, help="Número de sessões (conversas)")
+    parser.add_argument("--concurrency", type=int, default=5, help="Sessões simultâneas")
+    parser.add_argument("--prompt", action="append", help="Prompt de cada turno (pode repetir)")
+    parser.add_argument("--simulation", action="store_true", help="Forçar o modo de simulação do MCP Server")
+    args = parser.parse_args()
+
+    assistant_id = create_assistant()
+    results, elapsed, flights, queue = asyncio.run(load_test(
+        assistant_id, args.sessions, args.concurrency, args.prompt or DEFAULT_PROMPTS, args.simulation
+    ))
+
+    latencies = sorted(turn["latency"] for session in results for turn in session.turns)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"Sessões: {len(results)} em {elapsed:.2f}s ({len(results) / elapsed:.2f} sessões/s)")
+    print(f"Turnos: {len(latencies)} | latência p50: {statistics.median(latencies):.2f}s | p95: {p95:.2f}s")
+    print(f"Requisições ao MCP Server compartilhadas: {flights['coalesced']} de {flights['calls']}")
+    if queue:
+        print(f"Fila do MCP Server: {queue}")
+
+
+if __name__ == "__main__":
+    main()
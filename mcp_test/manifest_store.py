@@ -0,0 +1,112 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+
+from manifests import manifest_key
+
+# Arquivo onde os últimos specs aplicados são guardados (vazio = só em memória)
+STORE_PATH = os.getenv("MCP_MANIFEST_STORE", "")
+
+# Campos preenchidos pelo servidor, que não fazem parte da intenção do usuário
+_SERVER_METADATA = (
+    "uid", "resourceVersion", "generation", "creationTimestamp",
+    "managedFields", "selfLink", "deletionTimestamp",
+)
+_LAST_APPLIED = "kubectl.kubernetes.io/last-applied-configuration"
+
+
+def normalize(obj):
+    """Cópia do objeto sem status, campos do servidor e valores vazios."""
+    obj = copy.deepcopy(obj)
+    obj.pop("status", None)
+    metadata = obj.setdefault("metadata", {})
+    for field in _SERVER_METADATA:
+        metadata.pop(field, None)
+    annotations = metadata.get("annotations") or {}
+    annotations.pop(_LAST_APPLIED, None)
+    metadata.setdefault("namespace", manifest_key(obj)[1])
+    return _drop_empty(obj)
+
+
+def _drop_empty(value):
+    if isinstance(value, dict):
+        cleaned = {k: _drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, {}, [])}
+    if isinstance(value, list):
+        return [_drop_empty(v) for v in value]
+    return value
+
+
+def manifest_hash(obj):
+    """Hash estável do objeto normalizado (independe de ordem de chaves e formatação)."""
+    canonical = json.dumps(normalize(obj), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def diff(old, new, path=""):
+    """Diferença estrutural entre dois objetos, como lista de alterações por caminho."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(set(old) | set(new)):
+            child = f"{path}.{key}" if path else key
+            if key not in old:
+                changes.append({"path": child, "op": "add", "new": new[key]})
+            elif key not in new:
+                changes.append({"path": child, "op": "remove", "old": old[key]})
+            else:
+                changes.extend(diff(old[key], new[key], child))
+        return changes
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changes = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            changes.extend(diff(a, b, f"{path}[{index}]"))
+        return changes
+    if old != new:
+        return [{"path": path, "op": "replace", "old": old, "new": new}]
+    return []
+
+
+class ManifestStore:
+    """Último spec aplicado por (kind, namespace, name), para evitar applies sem mudança."""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.unchanged = 0
+        self._specs = {}
+        self._lock = threading.Lock()
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._specs = {tuple(json.loads(key)): spec for key, spec in json.load(f).items()}
+            except (FileNotFoundError, ValueError):
+                self._specs = {}
+
+    def check(self, obj):
+        """Retorna (inalterado, alterações) do objeto em relação ao último apply."""
+        key = manifest_key(obj)
+        with self._lock:
+            previous = self._specs.get(key)
+        if previous is None:
+            return False, None
+        current = normalize(obj)
+        if previous["hash"] == manifest_hash(obj):
+            self.unchanged += 1
+            return True, []
+        return False, diff(previous["spec"], current)
+
+    def record(self, obj):
+        """Guarda o objeto como último apply bem-sucedido."""
+        key = manifest_key(obj)
+        with self._lock:
+            self._specs[key] = {"hash": manifest_hash(obj), "spec": normalize(obj)}
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({json.dumps(list(key)): spec for key, spec in self._specs.items()}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,154 @@
+import json
+import re
+
+import yaml
+
+# Extração simples de identidade de objetos, usada quando o YAML/JSON é inválido
+_KIND_RE = re.compile(r'"?kind"?\s*:\s*"?([A-Za-z]+)')
+_NAME_RE = re.compile(r'"?name"?\s*:\s*"?([a-zA-Z0-9.-]+)')
+_NAMESPACE_RE = re.compile(r'"?namespace"?\s*:\s*"?([a-zA-Z0-9.-]+)')
+
+# Ordem de aplicação por camadas: objetos de uma mesma camada são independentes
+# entre si e podem ser aplicados em paralelo; kinds desconhecidos (ex.: custom
+# resources) ficam por último, depois das CRDs
+APPLY_TIERS = [
+    {"Namespace", "CustomResourceDefinition", "PriorityClass", "StorageClass"},
+    {
+        "ServiceAccount", "Secret", "ConfigMap", "ResourceQuota", "LimitRange",
+        "NetworkPolicy", "PersistentVolume", "PersistentVolumeClaim",
+        "ClusterRole", "ClusterRoleBinding", "Role", "RoleBinding",
+    },
+    {
+        "Service", "Pod", "ReplicationController", "ReplicaSet", "Deployment",
+        "StatefulSet", "DaemonSet", "Job", "CronJob",
+    },
+    {"Ingress", "HorizontalPodAutoscaler", "PodDisruptionBudget"},
+]
+
+
+def parse_manifests(config):
+    """Converte um YAML (multi-documento) ou JSON em uma lista de objetos.
+
+    Objetos `kind: List` e listas JSON são expandidos em seus itens. Lança
+    ValueError se o conteúdo não puder ser interpretado.
+    """
+    config = config or ""
+    try:
+        documents = [json.loads(config)]
+    except ValueError:
+        try:
+            documents = list(yaml.safe_load_all(config))
+        except yaml.YAMLError as e:
+            raise ValueError(f"Configuração inválida: {e}")
+
+    objects = []
+    for document in documents:
+        if isinstance(document, list):
+            objects.extend(document)
+        elif isinstance(document, dict) and document.get("kind", "").endswith("List") and "items" in document:
+            objects.extend(document["items"])
+        elif document is not None:
+            objects.append(document)
+
+    if not all(isinstance(obj, dict) for obj in objects):
+        raise ValueError("Configuração inválida: cada documento deve ser um objeto")
+    return objects
+
+
+def manifest_key(obj):
+    """Retorna (kind, namespace, name) de um objeto já interpretado."""
+    metadata = obj.get("metadata") or {}
+    return (
+        obj.get("kind") or "desconhecido",
+        metadata.get("namespace") or "default",
+        metadata.get("name") or "recurso",
+    )
+
+
+def object_key(config):
+    """Retorna (kind, namespace, name) do primeiro objeto descrito em `config`."""
+    try:
+        objects = parse_manifests(config)
+        if objects:
+            return manifest_key(objects[0])
+    except ValueError:
+        pass
+
+    config = config or ""
+    kind = _KIND_RE.search(config)
+    name = _NAME_RE.search(config)
+    namespace = _NAMESPACE_RE.search(config)
+    return (
+        kind.group(1) if kind else "desconhecido",
+        namespace.group(1) if namespace else "default",
+        name.group(1) if name else "recurso",
+    )
+
+
+def apply_tier(kind):
+    """Camada de aplicação do kind (kinds desconhecidos vão para a última)."""
+    for tier, kinds in enumerate(APPLY_TIERS):
+        if kind in kinds:
+            return tier
+    return len(APPLY_TIERS)
+
+
+def dump_manifest(obj):
+    """Serializa um único objeto de volta para YAML."""
+    return yaml.safe_dump(obj, sort_keys=False, allow_unicode=True)
+
+
+# Tipos de recurso (como usados em getKubernetesResources) para kinds irregulares
+_IRREGULAR_PLURALS = {
+    "ingress": "ingresses",
+    "networkpolicy": "networkpolicies",
+    "podsecuritypolicy": "podsecuritypolicies",
+    "endpoints": "endpoints",
+}
+
+# Kinds que criam ou removem pods quando aplicados
+WORKLOAD_KINDS = {"Deployment", "ReplicaSet", "StatefulSet", "DaemonSet", "Job", "CronJob", "Pod"}
+
+
+def resource_type_for_kind(kind):
+    """Converte um kind (ex.: Deployment) no tipo de recurso plural (ex.: deployments)."""
+    kind = (kind or "").lower()
+    if kind in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[kind]
+    # Mesmas regras do Kubernetes: StorageClass -> storageclasses, PriorityClass -> priorityclasses
+    if kind.endswith(("s", "x", "ch", "sh")):
+        return f"{kind}es"
+    if kind.endswith("y") and kind[-2:-1] not in ("a", "e", "i", "o", "u"):
+        return f"{kind[:-1]}ies"
+    return f"{kind}s"
+
+
+# Nomes curtos aceitos pelo kubectl
+_SHORT_NAMES = {
+    "po": "pods",
+    "deploy": "deployments",
+    "svc": "services",
+    "ns": "namespaces",
+    "no": "nodes",
+    "cm": "configmaps",
+    "ing": "ingresses",
+    "sc": "storageclasses",
+    "pv": "persistentvolumes",
+    "pvc": "persistentvolumeclaims",
+    "sts": "statefulsets",
+    "ds": "daemonsets",
+    "rs": "replicasets",
+}
+
+
+def normalize_resource_type(resource_type):
+    """Forma plural em minúsculas de um resourceType (pod, Pod, pods e po viram pods)."""
+    name = (resource_type or "").strip().lower()
+    if not name:
+        return name
+    if name in _SHORT_NAMES:
+        return _SHORT_NAMES[name]
+    # Já está no plural se for o plural do próprio singular (pods, ingresses, storageclasses)
+    if name.endswith("s") and resource_type_for_kind(name[:-1]) == name:
+        return name
+    return resource_type_for_kind(name)
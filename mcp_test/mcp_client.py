@@ -0,0 +1,97 @@
+import os
+import threading
+
+# Configurações padrão do cliente (podem ser sobrescritas pelo .env)
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "10"))
+# Timeout de conexão curto (falhar rápido com o servidor fora do ar) e de leitura maior
+DEFAULT_TIMEOUT = (float(os.getenv("MCP_CONNECT_TIMEOUT", "2")), float(os.getenv("MCP_TIMEOUT", "10")))
+DEFAULT_RETRIES = int(os.getenv("MCP_RETRIES", "3"))
+DEFAULT_BACKOFF = float(os.getenv("MCP_BACKOFF", "0.3"))
+
+
+def _retry_class():
+    """Retry do urllib3 que não repete timeouts (importado só quando o cliente é criado)."""
+    from urllib3.exceptions import NewConnectionError, TimeoutError
+    from urllib3.util.retry import Retry
+
+    class TimeoutAwareRetry(Retry):
+        # Com o servidor aceitando conexões mas sem responder, cada tentativa esperaria o
+        # timeout inteiro: um timeout vira uma única falha (e vai direto ao circuit breaker).
+        # Conexões recusadas e conexões do pool que caíram continuam sendo repetidas.
+        def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+            if isinstance(error, TimeoutError) and not isinstance(error, NewConnectionError):
+                raise error.with_traceback(_stacktrace)
+            return super().increment(method, url, response, error, _pool, _stacktrace)
+
+    return TimeoutAwareRetry
+
+
+class MCPClient:
+    """Cliente HTTP para o MCP Server com pool de conexões e keep-alive.
+
+    Todas as chamadas reutilizam a mesma `requests.Session`, evitando abrir
+    uma nova conexão TCP a cada chamada de ferramenta. Falhas de conexão e
+    respostas 5xx são repetidas com backoff exponencial; timeouts não.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
+        # requests é importado aqui, e não no topo, para não atrasar a inicialização do assistente
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = _retry_class()(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            # POST também é repetido: tools/get é idempotente e tools/apply
+            # é declarativo (aplicar o mesmo YAML duas vezes é seguro)
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Health checks não são repetidos: servem justamente para detectar falhas rápido
+        self.probe_session = requests.Session()
+
+    def url(self, path):
+        return f"{self.base_url}/v1/{path}"
+
+    def health(self, timeout=None):
+        """Consulta o endpoint de health do MCP Server (sem retries)."""
+        return self.probe_session.get(self.url("health"), timeout=timeout or self.timeout)
+
+    def post(self, endpoint, payload, timeout=None, stream=False):
+        """Envia um payload JSON para um endpoint de ferramenta (ex.: tools/get).
+
+        Com `stream=True`, o corpo não é lido de imediato (ver streaming_json).
+        """
+        return self.session.post(self.url(endpoint), json=payload, timeout=timeout or self.timeout, stream=stream)
+
+    def close(self):
+        self.session.close()
+        self.probe_session.close()
+
+
+# Um cliente compartilhado por URL, para que todos os módulos usem o mesmo pool
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url, **kwargs):
+    """Retorna o cliente compartilhado para a URL informada, criando-o se necessário."""
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = MCPClient(base_url, **kwargs)
+            _clients[base_url] = client
+        return client
@@ -0,0 +1,283 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import instrumentation
+
+# Workers que enviam as requisições ao MCP Server
+DEFAULT_WORKERS = int(os.getenv("MCP_QUEUE_WORKERS", "4"))
+
+# Requisições aguardando na fila; acima disso, novas requisições são recusadas
+DEFAULT_MAX_DEPTH = int(os.getenv("MCP_QUEUE_MAX_DEPTH", "64"))
+
+# Tempo máximo (segundos) de espera na fila antes de desistir da requisição
+DEFAULT_MAX_WAIT = float(os.getenv("MCP_QUEUE_MAX_WAIT", "30"))
+
+# Requisições por segundo permitidas por endpoint (token bucket; 0 = sem limite)
+DEFAULT_RATES = {
+    "tools/get": float(os.getenv("MCP_RATE_GET", "20")),
+    "tools/apply": float(os.getenv("MCP_RATE_APPLY", "5")),
+}
+
+# Leituras passam na frente das escritas
+READ_PRIORITY = 0
+WRITE_PRIORITY = 1
+READ_ENDPOINTS = ("tools/get",)
+
+
+class BackpressureError(Exception):
+    """A fila está cheia ou a requisição esperou demais; `retry_after` sugere quando tentar de novo."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Limita a taxa de requisições: `rate` por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Consome um token se houver; senão, retorna quanto tempo falta para o próximo
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return now, 0.0
+            return now, (1 - self.tokens) / self.rate
+
+    def acquire(self, deadline):
+        """Consome um token, aguardando até `deadline` (time.monotonic); retorna False se não houver."""
+        if self.rate <= 0:
+            return True
+        while True:
+            now, wait = self._take()
+            if not wait:
+                return True
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, deadline):
+        """Versão para asyncio de `acquire` (aguarda sem bloquear o event loop)."""
+        import asyncio
+
+        if self.rate <= 0:
+            return True
+        while True:
+            now, wait = self._take()
+            if not wait:
+                return True
+            if now + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class _Job:
+    def __init__(self, endpoint, fn, deadline, parent):
+        self.endpoint = endpoint
+        self.fn = fn
+        self.deadline = deadline
+        self.parent = parent
+        self.enqueued_at = time.monotonic()
+        self.future = Future()
+
+
+class RequestQueue:
+    """Fila limitada, com prioridade, para as requisições ao MCP Server.
+
+    Um número fixo de workers envia as requisições, respeitando um token
+    bucket por endpoint; leituras (tools/get) são atendidas antes das escritas
+    (tools/apply). O limite `max_depth` vale separadamente para leituras e
+    escritas, para que uma rajada de applies não bloqueie as consultas. Com a
+    fila cheia, ou quando a espera passa de `max_wait`, a requisição falha com
+    BackpressureError em vez de sobrecarregar o servidor.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_depth=DEFAULT_MAX_DEPTH,
+                 max_wait=DEFAULT_MAX_WAIT, rates=None):
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+        self.buckets = {endpoint: TokenBucket(rate) for endpoint, rate in (rates or DEFAULT_RATES).items()}
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.max_depth_seen = 0
+        self.total_wait = 0.0
+        self.started = 0
+        self._heap = []
+        self._depth = {READ_PRIORITY: 0, WRITE_PRIORITY: 0}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"mcp-queue-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _retry_after(self):
+        # Estimativa simples: tempo para esvaziar a fila na taxa mais lenta configurada
+        rates = [bucket.rate for bucket in self.buckets.values() if bucket.rate > 0]
+        return round(max(1.0, len(self._heap) / min(rates)) if rates else 1.0, 1)
+
+    def _push(self, priority, job):
+        # Chamado com self._cond adquirido
+        if self._depth[priority] >= self.max_depth:
+            self.rejected += 1
+            instrumentation.inc("mcp_queue_rejected_total", endpoint=job.endpoint, reason="full")
+            raise BackpressureError(
+                f"Fila do MCP Server cheia ({self._depth[priority]} requisições aguardando)",
+                self._retry_after()
+            )
+        heapq.heappush(self._heap, (priority, next(self._sequence), job))
+        self._depth[priority] += 1
+        self.submitted += 1
+        self.max_depth_seen = max(self.max_depth_seen, len(self._heap))
+        instrumentation.observe("mcp_queue_depth", len(self._heap), (1, 2, 4, 8, 16, 32, 64, 128, 256),
+                                endpoint=job.endpoint)
+
+    def _expire(self, job):
+        with self._cond:
+            self.expired += 1
+        instrumentation.inc("mcp_queue_rejected_total", endpoint=job.endpoint, reason="timeout")
+        return BackpressureError(
+            f"Requisição ao MCP Server aguardou mais de {self.max_wait:.0f}s na fila",
+            self._retry_after()
+        )
+
+    def _started(self, job):
+        wait = time.monotonic() - job.enqueued_at
+        with self._cond:
+            self.started += 1
+            self.total_wait += wait
+        instrumentation.observe("mcp_queue_wait_seconds", wait, instrumentation.DURATION_BUCKETS,
+                                endpoint=job.endpoint)
+        return wait
+
+    def submit(self, endpoint, fn):
+        """Enfileira `fn()` (a requisição ao endpoint) e retorna um Future com o resultado."""
+        priority = READ_PRIORITY if endpoint in READ_ENDPOINTS else WRITE_PRIORITY
+        job = _Job(endpoint, fn, time.monotonic() + self.max_wait, instrumentation.tracer.current())
+        with self._cond:
+            self._push(priority, job)
+            self._start_workers()
+            self._cond.notify()
+        return job.future
+
+    def run(self, endpoint, fn):
+        """Executa `fn()` pela fila e retorna o resultado (ou levanta BackpressureError)."""
+        return self.submit(endpoint, fn).result()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                priority, _, job = heapq.heappop(self._heap)
+                self._depth[priority] -= 1
+
+            bucket = self.buckets.get(job.endpoint)
+            if (bucket is not None and not bucket.acquire(job.deadline)) or time.monotonic() > job.deadline:
+                job.future.set_exception(self._expire(job))
+                continue
+
+            wait = self._started(job)
+            try:
+                with instrumentation.span("mcp_queue_job", parent=job.parent, endpoint=job.endpoint,
+                                          wait_ms=round(wait * 1000, 1)):
+                    result = job.fn()
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": len(self._heap),
+                "max_depth": self.max_depth_seen,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "avg_wait_ms": round(self.total_wait / self.started * 1000, 1) if self.started else 0.0,
+            }
+
+
+class AsyncRequestQueue(RequestQueue):
+    """Versão para asyncio da RequestQueue (várias sessões em um mesmo event loop).
+
+    Mesmas prioridades, limites de profundidade, token buckets e espera
+    máxima; em vez de threads, no máximo `workers` corrotinas passam da fila
+    ao mesmo tempo.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._active = 0
+
+    def _dispatch(self):
+        # Libera a vez dos próximos da fila (leituras primeiro) enquanto houver vagas
+        with self._cond:
+            while self._heap and self._active < self.workers:
+                priority, _, job = heapq.heappop(self._heap)
+                self._depth[priority] -= 1
+                if job.future.done():
+                    continue
+                self._active += 1
+                job.future.set_result(None)
+
+    def _leave(self):
+        with self._cond:
+            self._active -= 1
+        self._dispatch()
+
+    async def run(self, endpoint, fn):
+        """Executa `await fn()` pela fila e retorna o resultado (ou levanta BackpressureError)."""
+        import asyncio
+
+        priority = READ_PRIORITY if endpoint in READ_ENDPOINTS else WRITE_PRIORITY
+        # Sem span: a pilha de spans é por thread e as corrotinas se intercalam na mesma thread
+        job = _Job(endpoint, fn, time.monotonic() + self.max_wait, None)
+        job.future = asyncio.get_running_loop().create_future()
+        with self._cond:
+            self._push(priority, job)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(job.future), max(0.0, job.deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            if job.future.done():
+                # A vez foi liberada junto com o timeout: devolvê-la
+                self._leave()
+            else:
+                job.future.cancel()
+            raise self._expire(job)
+        except asyncio.CancelledError:
+            if job.future.done() and not job.future.cancelled():
+                self._leave()
+            else:
+                job.future.cancel()
+            raise
+
+        try:
+            bucket = self.buckets.get(endpoint)
+            if bucket is not None and not await bucket.acquire_async(job.deadline):
+                raise self._expire(job)
+            self._started(job)
+            return await fn()
+        finally:
+            self._leave()
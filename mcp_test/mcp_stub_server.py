@@ -0,0 +1,256 @@
+import argparse
+import json
+import random
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from manifests import manifest_key, parse_manifests, resource_type_for_kind
+from resource_index import ALL_NAMESPACES, CLUSTER_SCOPED_TYPES, item_namespace, item_name
+from simulation import simulate_mcp_response
+
+RESOURCE_TYPES = ["pods", "deployments", "services", "nodes", "namespaces"]
+
+# Distribuição das fases dos pods sintéticos
+_PHASES = ["Running"] * 90 + ["Pending"] * 5 + ["Succeeded"] * 3 + ["Failed"] * 2
+
+
+class SyntheticCluster:
+    """Cluster Kubernetes em memória para o servidor MCP local.
+
+    Parte dos mesmos dados de `simulate_mcp_response` e acrescenta namespaces,
+    deployments, pods, services e nodes sintéticos (com managedFields,
+    anotações e ownerReferences, como em um cluster real). Os applies alteram
+    o estado: aplicar um Deployment recria os pods conforme `spec.replicas`.
+    """
+
+    def __init__(self, namespaces=0, deployments_per_namespace=2, pods_per_deployment=3,
+                 nodes=3, seed=0, include_simulation=True):
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._objects = {resource_type: {} for resource_type in RESOURCE_TYPES}
+        self._serialized = {}
+        self._replica_sets = {}
+        self.version = 0
+
+        if include_simulation:
+            for resource_type in RESOURCE_TYPES:
+                for item in simulate_mcp_response("tools/get", {"resourceType": resource_type})["items"]:
+                    self._store(resource_type, item)
+
+        self._node_names = [f"node-{i:03d}" for i in range(nodes)]
+        for name in self._node_names:
+            self._store("nodes", self._node(name))
+        for i in range(namespaces):
+            namespace = f"ns-{i:04d}"
+            self._store("namespaces", {"metadata": self._metadata(namespace), "status": {"phase": "Active"}})
+            for j in range(deployments_per_namespace):
+                self._create_deployment(namespace, f"app-{j:03d}", pods_per_deployment)
+
+    def _metadata(self, name, namespace=None, labels=None):
+        metadata = {
+            "name": name,
+            "uid": str(uuid.UUID(int=self._random.getrandbits(128))),
+            "resourceVersion": str(self._random.randint(1000, 999999)),
+            "creationTimestamp": "2024-01-01T00:00:00Z",
+            "labels": labels or {},
+            "annotations": {"kubectl.kubernetes.io/last-applied-configuration": "{}"},
+            "managedFields": [{
+                "manager": "kube-controller-manager",
+                "operation": "Update",
+                "apiVersion": "v1",
+                "fieldsType": "FieldsV1",
+                "fieldsV1": {"f:status": {"f:conditions": {}, "f:phase": {}}},
+            }],
+        }
+        if namespace:
+            metadata["namespace"] = namespace
+        return metadata
+
+    def _node(self, name):
+        return {
+            "metadata": self._metadata(name, labels={"kubernetes.io/hostname": name}),
+            "status": {
+                "conditions": [{"type": "Ready", "status": "True", "reason": "KubeletReady"}],
+                "nodeInfo": {"kubeletVersion": "v1.29.0"},
+            },
+        }
+
+    def _pod(self, namespace, owner, name, labels):
+        phase = self._random.choice(_PHASES)
+        metadata = self._metadata(name, namespace, labels)
+        metadata["ownerReferences"] = [{"kind": "ReplicaSet", "name": owner, "controller": True}]
+        return {
+            "metadata": metadata,
+            "spec": {
+                "nodeName": self._random.choice(self._node_names or ["kind-control-plane"]),
+                "containers": [{"name": "app", "image": "nginx:latest"}],
+            },
+            "status": {
+                "phase": phase,
+                "conditions": [{"type": "Ready", "status": "True" if phase == "Running" else "False"}],
+                "containerStatuses": [{"name": "app", "ready": phase == "Running", "restartCount": 0}],
+            },
+        }
+
+    def _create_deployment(self, namespace, name, replicas, spec=None):
+        labels = {"app": name}
+        replica_set = f"{name}-{self._random.getrandbits(32):08x}"
+
+        # Remover os pods do ReplicaSet anterior deste Deployment
+        previous = self._replica_sets.get((namespace, name))
+        if previous:
+            pods = self._objects["pods"]
+            for key in [key for key, pod in pods.items() if key[0] == namespace and
+                        any(ref.get("name") == previous for ref in pod["metadata"].get("ownerReferences", []))]:
+                del pods[key]
+        self._replica_sets[(namespace, name)] = replica_set
+
+        for k in range(replicas):
+            self._store("pods", self._pod(namespace, replica_set, f"{replica_set}-{k:03d}", labels))
+
+        deployment = {
+            "metadata": self._metadata(name, namespace, labels),
+            "spec": spec or {"replicas": replicas, "selector": {"matchLabels": labels}},
+            "status": {"replicas": replicas, "readyReplicas": replicas, "availableReplicas": replicas},
+        }
+        self._store("deployments", deployment)
+        self._store("services", {
+            "metadata": self._metadata(f"{name}-svc", namespace, labels),
+            "spec": {"type": "ClusterIP", "clusterIP": f"10.96.{self._random.randint(0, 255)}.{self._random.randint(1, 254)}",
+                     "selector": labels, "ports": [{"port": 80, "targetPort": 80}]},
+        })
+
+    def _store(self, resource_type, item):
+        namespace = None if resource_type in CLUSTER_SCOPED_TYPES else item_namespace(item)
+        self._objects.setdefault(resource_type, {})[(namespace, item_name(item))] = item
+
+    def counts(self):
+        with self._lock:
+            return {resource_type: len(items) for resource_type, items in self._objects.items()}
+
+    def list(self, resource_type, namespace="default"):
+        resource_type = (resource_type or "").lower()
+        with self._lock:
+            items = self._objects.get(resource_type, {})
+            if resource_type in CLUSTER_SCOPED_TYPES or namespace in ALL_NAMESPACES:
+                return list(items.values())
+            return [item for key, item in items.items() if key[0] == namespace]
+
+    def list_json(self, resource_type, namespace="default"):
+        """Resposta de tools/get já serializada (reutilizada até o próximo apply)."""
+        key = ((resource_type or "").lower(), namespace)
+        with self._lock:
+            cached = self._serialized.get(key)
+            if cached and cached[0] == self.version:
+                return cached[1]
+            body = json.dumps({"items": self.list(resource_type, namespace)}).encode()
+            self._serialized[key] = (self.version, body)
+            return body
+
+    def apply(self, config):
+        """Aplica um ou vários objetos e retorna a resposta no formato de tools/apply."""
+        objects = parse_manifests(config)
+        results = []
+        with self._lock:
+            for obj in objects:
+                kind, namespace, name = manifest_key(obj)
+                resource_type = resource_type_for_kind(kind)
+                if kind == "Deployment":
+                    spec = obj.get("spec") or {}
+                    self._create_deployment(namespace, name, int(spec.get("replicas", 1)), spec)
+                else:
+                    obj.setdefault("metadata", {}).setdefault("name", name)
+                    if resource_type not in CLUSTER_SCOPED_TYPES:
+                        obj["metadata"].setdefault("namespace", namespace)
+                    self._store(resource_type, obj)
+                results.append({
+                    "status": "success",
+                    "message": f"{kind} '{name}' aplicado com sucesso",
+                    "resource": {"kind": kind, "namespace": namespace, "name": name},
+                })
+            self.version += 1
+
+        if len(results) == 1:
+            return results[0]
+        return {"status": "success", "message": f"{len(results)} objetos aplicados com sucesso", "results": results}
+
+
+class MCPStubHandler(BaseHTTPRequestHandler):
+    """Implementa /v1/health, /v1/tools/get e /v1/tools/apply sobre um SyntheticCluster."""
+
+    protocol_version = "HTTP/1.1"
+    # Sem isto, cabeçalho e corpo em writes separados esbarram no delayed ACK
+    disable_nagle_algorithm = True
+    cluster = None
+
+    def do_GET(self):
+        if self.path == "/v1/health":
+            self._reply(200, b'{"status": "ok"}')
+        else:
+            self._reply(404, b'{"error": "not found"}')
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._reply(400, b'{"error": "invalid json"}')
+            return
+
+        if self.path == "/v1/tools/get":
+            body = self.cluster.list_json(payload.get("resourceType", ""), payload.get("namespace", "default"))
+            self._reply(200, body)
+        elif self.path == "/v1/tools/apply":
+            try:
+                result = self.cluster.apply(payload.get("config", ""))
+                self._reply(200, json.dumps(result).encode())
+            except ValueError as e:
+                self._reply(400, json.dumps({"status": "error", "message": str(e)}).encode())
+        else:
+            self._reply(404, b'{"error": "not found"}')
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(cluster=None, host="127.0.0.1", port=0):
+    """Inicia o servidor em uma thread e retorna (server, url)."""
+    handler = type("BoundMCPStubHandler", (MCPStubHandler,), {"cluster": cluster or SyntheticCluster()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP Server local com cluster sintético")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--namespaces", type=int, default=10, help="Namespaces sintéticos")
+    parser.add_argument("--deployments", type=int, default=5, help="Deployments por namespace")
+    parser.add_argument("--pods", type=int, default=3, help="Pods por deployment")
+    parser.add_argument("--nodes", type=int, default=3, help="Nodes sintéticos")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("Gerando cluster sintético...")
+    cluster = SyntheticCluster(args.namespaces, args.deployments, args.pods, args.nodes, args.seed)
+    server, url = start_server(cluster, args.host, args.port)
+    print(f"MCP Server local em {url} com {cluster.counts()}")
+    print("Pressione Ctrl+C para encerrar")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import json
+import os
+import threading
+
+from resource_index import item_namespace
+from streaming_json import ItemStream
+
+# Campos mantidos por tipo de recurso (caminhos separados por ponto)
+DEFAULT_FIELDS = {
+    "pods": [
+        "metadata.name", "metadata.namespace", "namespace", "metadata.labels",
+        "spec.nodeName", "status.phase", "status.conditions"
+    ],
+    "deployments": [
+        "metadata.name", "metadata.namespace", "metadata.labels",
+        "spec.replicas", "status.replicas", "status.readyReplicas",
+        "status.availableReplicas", "status.conditions"
+    ],
+    "services": [
+        "metadata.name", "metadata.namespace", "spec.type", "spec.clusterIP",
+        "spec.ports", "spec.selector"
+    ],
+    "nodes": [
+        "metadata.name", "metadata.labels", "status.conditions",
+        "status.nodeInfo.kubeletVersion"
+    ],
+    "namespaces": ["metadata.name", "status.phase"],
+}
+FALLBACK_FIELDS = ["metadata.name", "metadata.namespace", "namespace", "spec", "status"]
+
+# Tamanho máximo (bytes de JSON) da saída de uma ferramenta
+DEFAULT_BUDGET = int(os.getenv("MCP_OUTPUT_BUDGET", "20000"))
+
+# Namespaces listados no resumo da saída paginada (os demais só são contados)
+SUMMARY_TOP_NAMESPACES = int(os.getenv("MCP_SUMMARY_TOP_NAMESPACES", "20"))
+
+# Campos de condições mantidos (descarta lastTransitionTime, message longa etc.)
+_CONDITION_FIELDS = ("type", "status", "reason")
+
+
+class ProjectionStats:
+    """Contadores acumulados de bytes antes/depois da projeção."""
+
+    def __init__(self):
+        self.original_bytes = 0
+        self.output_bytes = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, original, output):
+        with self._lock:
+            self.calls += 1
+            self.original_bytes += original
+            self.output_bytes += output
+
+    def summary(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "original_bytes": self.original_bytes,
+                "output_bytes": self.output_bytes,
+                "saved_bytes": self.original_bytes - self.output_bytes,
+            }
+
+
+stats = ProjectionStats()
+
+
+def get_path(item, path):
+    """Retorna o valor de um caminho com pontos (ex.: status.phase) ou None."""
+    value = item
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _set_path(target, path, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def project_item(item, fields):
+    """Copia de `item` apenas os caminhos listados em `fields` (sem alterar o original)."""
+    projected = {}
+    for path in fields:
+        value = get_path(item, path)
+        if value is None:
+            continue
+        if path.endswith("conditions") and isinstance(value, list):
+            value = [
+                {k: c[k] for k in _CONDITION_FIELDS if k in c}
+                for c in value if isinstance(c, dict)
+            ]
+        _set_path(projected, path, value)
+    return projected
+
+
+def _parse_requirements(selector):
+    """Converte 'a=b,c!=d,e,!f' em uma lista de (chave, operador, valor)."""
+    requirements = []
+    for term in (selector or "").split(","):
+        term = term.strip()
+        if not term:
+            continue
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            requirements.append((key.strip(), "!=", value.strip()))
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            requirements.append((key.strip(), "=", value.strip()))
+        elif term.startswith("!"):
+            requirements.append((term[1:].strip(), "!exists", None))
+        else:
+            requirements.append((term, "exists", None))
+    return requirements
+
+
+def _matches(requirements, lookup):
+    for key, op, expected in requirements:
+        actual = lookup(key)
+        if op == "exists" and actual is None:
+            return False
+        if op == "!exists" and actual is not None:
+            return False
+        if op == "=" and (actual is None or str(actual) != expected):
+            return False
+        if op == "!=" and actual is not None and str(actual) == expected:
+            return False
+    return True
+
+
+def item_matcher(label_selector=None, field_selector=None):
+    """Função que testa um item contra os seletores, ou None se não houver seletores."""
+    labels_req = _parse_requirements(label_selector)
+    fields_req = _parse_requirements(field_selector)
+    if not labels_req and not fields_req:
+        return None
+
+    def field_lookup(item):
+        def lookup(path):
+            if path == "metadata.namespace":
+                return item_namespace(item)
+            return get_path(item, path)
+        return lookup
+
+    def matches(item):
+        return (_matches(labels_req, ((item.get("metadata") or {}).get("labels") or {}).get)
+                and _matches(fields_req, field_lookup(item)))
+
+    return matches
+
+
+def filter_items(items, label_selector=None, field_selector=None):
+    """Filtra itens com a sintaxe de labelSelector/fieldSelector do Kubernetes."""
+    matches = item_matcher(label_selector, field_selector)
+    if matches is None:
+        return items
+    return [item for item in items if matches(item)]
+
+
+def _count_item(by_namespace, by_phase, item):
+    namespace = item_namespace(item)
+    by_namespace[namespace] = by_namespace.get(namespace, 0) + 1
+    phase = get_path(item, "status.phase")
+    if phase:
+        by_phase[phase] = by_phase.get(phase, 0) + 1
+
+
+def _summary(by_namespace, by_phase, top=SUMMARY_TOP_NAMESPACES):
+    # Com milhares de namespaces, só os maiores entram; o restante vira contagens
+    if len(by_namespace) > top:
+        largest = sorted(by_namespace.items(), key=lambda entry: (-entry[1], entry[0]))
+        summary = {
+            "byNamespace": dict(largest[:top]),
+            "otherNamespaces": len(largest) - top,
+            "otherNamespaceItems": sum(count for _, count in largest[top:]),
+        }
+    else:
+        summary = {"byNamespace": by_namespace}
+    if by_phase:
+        summary["byPhase"] = by_phase
+    return summary
+
+
+def summarize(items, top=SUMMARY_TOP_NAMESPACES):
+    """Contagens por namespace (os `top` maiores) e por fase, usadas quando a saída é paginada."""
+    by_namespace = {}
+    by_phase = {}
+    for item in items:
+        _count_item(by_namespace, by_phase, item)
+    return _summary(by_namespace, by_phase, top)
+
+
+def project_items(resource_type, items, label_selector=None, field_selector=None,
+                  fields=None, offset=0, budget=DEFAULT_BUDGET):
+    """Aplica seletores, projeção e paginação item a item.
+
+    `items` pode ser qualquer iterável (inclusive um ItemStream): cada item é
+    filtrado e reduzido assim que chega, e só os itens que cabem no orçamento
+    (a página pedida) ficam na memória.
+    """
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    fields = fields or DEFAULT_FIELDS.get((resource_type or "").lower(), FALLBACK_FIELDS)
+    offset = max(0, int(offset or 0))
+
+    matches = item_matcher(label_selector, field_selector)
+    by_namespace = {}
+    by_phase = {}
+    total = 0
+    # Tamanho de {"items": [...]} com todos os itens; enquanto couber no orçamento, eles são mantidos
+    total_size = len(json.dumps({"items": []}))
+    kept = []
+    # Paginação: incluir itens até o orçamento (sempre ao menos um)
+    page = []
+    page_sizes = []
+    page_size = 0
+    page_full = False
+    for item in items:
+        if matches is not None and not matches(item):
+            continue
+        projected = project_item(item, fields)
+        _count_item(by_namespace, by_phase, item)
+        item_size = len(json.dumps(projected)) + 2
+        total_size += item_size if total else item_size - 2
+        if kept is not None:
+            kept.append(projected)
+            if total_size > budget:
+                kept = None
+        if total >= offset and not page_full:
+            if page and page_size + item_size > budget:
+                page_full = True
+            else:
+                page.append(projected)
+                page_sizes.append(item_size)
+                page_size += item_size
+        total += 1
+
+    if kept is not None and not offset:
+        return {"items": kept}
+    summary = _summary(by_namespace, by_phase)
+    # O resumo e os campos da paginação também contam no orçamento: a página perde
+    # os últimos itens até caber (o tamanho é estimado com truncated/nextOffset)
+    overhead = len(json.dumps({"items": [], "total": total, "offset": offset, "summary": summary,
+                               "truncated": True, "nextOffset": offset + total}))
+    while len(page) > 1 and page_size + overhead > budget:
+        page_size -= page_sizes.pop()
+        page.pop()
+    result = {
+        "items": page,
+        "total": total,
+        "offset": offset,
+        "summary": summary,
+    }
+    if offset + len(page) < total:
+        result["truncated"] = True
+        result["nextOffset"] = offset + len(page)
+    return result
+
+
+def project_response(resource_type, response, label_selector=None, field_selector=None,
+                     fields=None, offset=0, budget=DEFAULT_BUDGET):
+    """Reduz uma resposta de tools/get antes de enviá-la ao modelo.
+
+    Aplica os seletores, mantém apenas os campos relevantes do tipo e, se a
+    saída passar de `budget` bytes, retorna apenas uma página de itens com
+    `nextOffset` e um resumo por namespace/fase. A resposta pode ser um
+    dicionário ou um ItemStream (lido em streaming). Retorna (resposta, bytes_economizados).
+    """
+    streamed = isinstance(response, ItemStream)
+    if not streamed and (not isinstance(response, dict) or not isinstance(response.get("items"), list)):
+        return response, 0
+    try:
+        offset = max(0, int(offset or 0))
+    except (TypeError, ValueError):
+        if streamed:
+            response.close()
+        return {"error": f"offset inválido: {offset!r} (use um número, como o nextOffset da página anterior)"}, 0
+
+    if streamed:
+        result = project_items(resource_type, response, label_selector, field_selector, fields, offset, budget)
+        if not response.found:
+            return response.extra, 0
+        original_size = response.bytes_read
+    else:
+        original_size = len(json.dumps(response))
+        result = project_items(resource_type, response["items"], label_selector, field_selector,
+                               fields, offset, budget)
+
+    output_size = len(json.dumps(result))
+    stats.add(original_size, output_size)
+    return result, original_size - output_size
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from manifests import normalize_resource_type
+
+# TTL (segundos) por tipo de recurso: pods mudam com frequência, namespaces raramente
+DEFAULT_TTLS = {
+    "pods": 5,
+    "deployments": 10,
+    "services": 30,
+    "nodes": 30,
+    "namespaces": 60,
+}
+DEFAULT_TTL = float(os.getenv("MCP_CACHE_TTL", "10"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "256"))
+
+# Namespaces que representam "todos os namespaces" e portanto contêm qualquer outro
+_ALL_NAMESPACES = {"", "all", "*"}
+
+
+class ResourceCache:
+    """Cache LRU com TTL por tipo de recurso para respostas de tools/get.
+
+    Cada chave tem uma geração, incrementada por `invalidate`. Quem perde no
+    cache guarda a geração antes de consultar o MCP Server e a passa para
+    `put`: se um apply invalidou a chave nesse meio tempo, a resposta (anterior
+    ao apply) é descartada em vez de guardada.
+    """
+
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self._entries = OrderedDict()
+        # Gerações por tipo, por chave e das chaves de "todos os namespaces" de cada tipo
+        self._type_generations = {}
+        self._key_generations = {}
+        self._all_generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(resource_type, namespace):
+        # pod, Pod e pods são a mesma chave (o mesmo plural usado na invalidação)
+        return (normalize_resource_type(resource_type), namespace or "default")
+
+    def get(self, resource_type, namespace):
+        """Retorna a resposta em cache ou None se ausente/expirada."""
+        key = self.key(resource_type, namespace)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _generation(self, key):
+        resource_type, namespace = key
+        if namespace in _ALL_NAMESPACES:
+            return self._type_generations.get(resource_type, 0), self._all_generations.get(resource_type, 0)
+        return self._type_generations.get(resource_type, 0), self._key_generations.get(key, 0)
+
+    def generation(self, resource_type, namespace):
+        """Geração atual da chave; passe-a para `put` ao guardar a resposta obtida depois."""
+        with self._lock:
+            return self._generation(self.key(resource_type, namespace))
+
+    def put(self, resource_type, namespace, value, generation=None):
+        """Guarda a resposta; com `generation`, só se a chave não foi invalidada desde então."""
+        key = self.key(resource_type, namespace)
+        ttl = self.ttls.get(key[0], self.default_ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation(key):
+                self.stale_puts += 1
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, resource_type, namespace=None):
+        """Remove as entradas do tipo informado no namespace (e as de todos os namespaces)."""
+        resource_type = normalize_resource_type(resource_type)
+        with self._lock:
+            if namespace is None:
+                self._type_generations[resource_type] = self._type_generations.get(resource_type, 0) + 1
+            else:
+                key = (resource_type, namespace)
+                self._key_generations[key] = self._key_generations.get(key, 0) + 1
+                self._all_generations[resource_type] = self._all_generations.get(resource_type, 0) + 1
+            for key in list(self._entries):
+                if key[0] != resource_type:
+                    continue
+                if namespace is None or key[1] == namespace or key[1] in _ALL_NAMESPACES:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,174 @@
+import os
+import threading
+
+from manifests import normalize_resource_type
+
+# Tipos de recurso mantidos pelo informer
+DEFAULT_RESOURCE_TYPES = ["pods", "deployments", "services", "nodes", "namespaces"]
+
+# Tipos sem namespace (o filtro de namespace é ignorado)
+CLUSTER_SCOPED_TYPES = {
+    "nodes", "namespaces", "persistentvolumes", "storageclasses", "priorityclasses",
+    "ingressclasses", "runtimeclasses", "clusterroles", "clusterrolebindings",
+    "customresourcedefinitions",
+}
+
+# Namespaces que representam "todos os namespaces"
+ALL_NAMESPACES = {"", "all", "*"}
+
+DEFAULT_RESYNC_INTERVAL = float(os.getenv("MCP_INFORMER_RESYNC", "30"))
+
+
+def item_namespace(item):
+    # A simulação coloca o namespace fora de metadata; aceitar os dois formatos
+    metadata = item.get("metadata") or {}
+    return metadata.get("namespace") or item.get("namespace") or "default"
+
+
+def item_name(item):
+    return (item.get("metadata") or {}).get("name", "")
+
+
+class _TypeIndex:
+    """Índices imutáveis de um tipo de recurso (substituídos a cada resync)."""
+
+    def __init__(self, items):
+        self.items = {}
+        self.by_namespace = {}
+        self.by_label = {}
+        self.by_owner = {}
+
+        for item in items:
+            key = (item_namespace(item), item_name(item))
+            self.items[key] = item
+            self.by_namespace.setdefault(key[0], []).append(key)
+
+            metadata = item.get("metadata") or {}
+            for label in (metadata.get("labels") or {}).items():
+                self.by_label.setdefault(label, []).append(key)
+            for owner in metadata.get("ownerReferences") or []:
+                self.by_owner.setdefault((owner.get("kind"), owner.get("name")), []).append(key)
+
+
+class ResourceInformer:
+    """Índice local de recursos do cluster, no estilo de um shared informer.
+
+    Uma thread em segundo plano lista cada tipo de recurso por meio de
+    `list_fn(resource_type)` (que deve retornar uma resposta de tools/get) e
+    reconstrói os índices por namespace, label e owner. As consultas são
+    respondidas localmente, sem ida ao MCP Server. Com `namespace` diferente de
+    "all", só esse namespace é indexado e consultas de outros namespaces
+    retornam None (seguem para o cache/MCP Server). Para testes, a fonte pode
+    ser a própria simulação:
+
+        ResourceInformer(lambda t: simulate_mcp_response("tools/get", {"resourceType": t}))
+    """
+
+    def __init__(self, list_fn, resource_types=None, resync_interval=DEFAULT_RESYNC_INTERVAL, namespace="all"):
+        self.list_fn = list_fn
+        self.resource_types = [normalize_resource_type(t) for t in (resource_types or DEFAULT_RESOURCE_TYPES)]
+        self.resync_interval = resync_interval
+        self.namespace = namespace
+        self._indexes = {}
+        # Incrementada por request_resync: uma listagem iniciada antes não é instalada
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._dirty = set(self.resource_types)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a thread de sincronização (o primeiro sync é assíncrono)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="resource-informer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def sync(self, resource_types=None):
+        """Lista e reindexa os tipos informados (todos, por padrão) de forma síncrona."""
+        for resource_type in resource_types or self.resource_types:
+            with self._lock:
+                generation = self._generations.get(resource_type, 0)
+            response = self.list_fn(resource_type)
+            if not isinstance(response, dict) or "items" not in response:
+                # Falha na listagem: manter o índice anterior e tentar no próximo ciclo
+                with self._lock:
+                    self._dirty.add(resource_type)
+                continue
+            index = _TypeIndex(response["items"])
+            with self._lock:
+                if self._generations.get(resource_type, 0) != generation:
+                    # Um apply pediu resync durante a listagem: a resposta pode não incluí-lo
+                    continue
+                self._indexes[resource_type] = index
+                self._dirty.discard(resource_type)
+
+    def request_resync(self, resource_type=None):
+        """Marca um tipo (ou todos) como desatualizado e acorda a thread de sync."""
+        with self._lock:
+            if resource_type is None:
+                self._dirty.update(self.resource_types)
+                for name in self.resource_types:
+                    self._generations[name] = self._generations.get(name, 0) + 1
+            else:
+                resource_type = normalize_resource_type(resource_type)
+                if resource_type in self.resource_types:
+                    self._dirty.add(resource_type)
+                    self._generations[resource_type] = self._generations.get(resource_type, 0) + 1
+                    # Um índice desatualizado não deve responder consultas
+                    self._indexes.pop(resource_type, None)
+        self._wakeup.set()
+
+    def has_synced(self, resource_type):
+        with self._lock:
+            return normalize_resource_type(resource_type) in self._indexes
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                pending = list(self._dirty) or None
+            try:
+                self.sync(pending)
+            except Exception as e:
+                print(f"Erro na sincronização do informer: {e}")
+            self._wakeup.wait(self.resync_interval)
+            self._wakeup.clear()
+            with self._lock:
+                if not self._dirty:
+                    # Resync periódico completo
+                    self._dirty.update(self.resource_types)
+
+    def _index(self, resource_type):
+        with self._lock:
+            return self._indexes.get(normalize_resource_type(resource_type))
+
+    def list(self, resource_type, namespace="default"):
+        """Retorna {"items": [...]} como o tools/get, ou None se o tipo não está sincronizado."""
+        index = self._index(resource_type)
+        if index is None:
+            return None
+        if normalize_resource_type(resource_type) in CLUSTER_SCOPED_TYPES:
+            return {"items": list(index.items.values())}
+        if self.namespace not in ALL_NAMESPACES and namespace != self.namespace:
+            # Namespace fora do que foi indexado (inclusive "todos")
+            return None
+        if namespace in ALL_NAMESPACES:
+            return {"items": list(index.items.values())}
+        return {"items": [index.items[key] for key in index.by_namespace.get(namespace, [])]}
+
+    def by_label(self, resource_type, label, value):
+        index = self._index(resource_type)
+        if index is None:
+            return None
+        return [index.items[key] for key in index.by_label.get((label, value), [])]
+
+    def by_owner(self, resource_type, owner_kind, owner_name):
+        index = self._index(resource_type)
+        if index is None:
+            return None
+        return [index.items[key] for key in index.by_owner.get((owner_kind, owner_name), [])]
@@ -0,0 +1,92 @@
+from manifests import manifest_key, object_key, parse_manifests
+
+
+# Função para simular respostas do MCP Server
+def simulate_mcp_response(endpoint, payload):
+    if endpoint == "tools/get":
+        resource_type = payload.get("resourceType", "")
+        namespace = payload.get("namespace", "default")
+        
+        # Simular diferentes tipos de recursos
+        if resource_type.lower() == "pods":
+            return {
+                "items": [
+                    {"metadata": {"name": "nginx-pod"}, "status": {"phase": "Running"}},
+                    {"metadata": {"name": "app-backend"}, "status": {"phase": "Running"}},
+                    {"metadata": {"name": "coredns-1"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "coredns-2"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "etcd"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "kube-apiserver"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "kube-controller-manager"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "kube-scheduler"}, "namespace": "kube-system", "status": {"phase": "Running"}},
+                    {"metadata": {"name": "kube-proxy"}, "namespace": "kube-system", "status": {"phase": "Running"}}
+                ]
+            }
+        elif resource_type.lower() == "deployments":
+            return {
+                "items": [
+                    {"metadata": {"name": "nginx-deployment"}, "spec": {"replicas": 3}, "status": {"readyReplicas": 3}},
+                    {"metadata": {"name": "app-deployment"}, "spec": {"replicas": 2}, "status": {"readyReplicas": 2}}
+                ]
+            }
+        elif resource_type.lower() == "services":
+            return {
+                "items": [
+                    {"metadata": {"name": "kubernetes"}, "spec": {"type": "ClusterIP", "clusterIP": "10.96.0.1"}},
+                    {"metadata": {"name": "nginx-service"}, "spec": {"type": "ClusterIP", "clusterIP": "10.96.0.100"}}
+                ]
+            }
+        elif resource_type.lower() == "nodes":
+            return {
+                "items": [
+                    {"metadata": {"name": "kind-control-plane"}, "status": {"conditions": [{"type": "Ready", "status": "True"}]}}
+                ]
+            }
+        elif resource_type.lower() == "namespaces":
+            return {
+                "items": [
+                    {"metadata": {"name": "default"}},
+                    {"metadata": {"name": "kube-system"}},
+                    {"metadata": {"name": "kube-public"}},
+                    {"metadata": {"name": "kube-node-lease"}}
+                ]
+            }
+        else:
+            return {"items": []}
+            
+    elif endpoint == "tools/apply":
+        config = payload.get("config", "")
+        
+        # Identificar os objetos do YAML/JSON (um ou vários documentos)
+        try:
+            objects = [manifest_key(obj) for obj in parse_manifests(config)]
+        except ValueError:
+            objects = [object_key(config)]
+        
+        results = [
+            {
+                "status": "success",
+                "message": f"{kind} '{name}' aplicado com sucesso",
+                "resource": {"kind": kind, "namespace": namespace, "name": name}
+            }
+            for kind, namespace, name in objects or [object_key(config)]
+        ]
+        if len(results) == 1:
+            return results[0]
+        return {
+            "status": "success",
+            "message": f"{len(results)} objetos aplicados com sucesso",
+            "results": results
+        }
+    
+    return {"status": "error", "message": "Função não suportada na simulação"}
+
+
+# Respostas simuladas usadas como fallback levam "simulated": true, para que não
+# sejam tratadas como estado real do cluster (cache, último manifesto aplicado)
+def simulated_response(endpoint, payload):
+    return dict(simulate_mcp_response(endpoint, payload), simulated=True)
+
+
+def is_simulated(response):
+    return isinstance(response, dict) and response.get("simulated") is True
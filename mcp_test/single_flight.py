@@ -0,0 +1,143 @@
+import json
+import threading
+
+import instrumentation
+
+# Endpoints sem efeitos colaterais, cujas chamadas idênticas podem ser compartilhadas
+COALESCED_ENDPOINTS = ("tools/get",)
+
+
+def request_key(endpoint, payload):
+    """Chave da requisição: endpoint + payload canônico (independe da ordem das chaves)."""
+    return f"{endpoint} {json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Compartilha uma única chamada entre requisições idênticas em andamento.
+
+    A primeira requisição de uma chave executa a função; as que chegam
+    enquanto ela ainda não terminou aguardam e recebem o mesmo resultado
+    (ou a mesma exceção). Nada é guardado depois que a chamada termina.
+
+    Resultados que só podem ser lidos uma vez (ex.: ItemStream) passam por
+    `share` antes de serem entregues, mas só quando alguém aguardava.
+
+    `forget` desliga das chaves as chamadas cuja `tag` (ex.: o payload) casa
+    com um filtro: quem chegar depois (ex.: após um apply) faz uma nova
+    requisição em vez de receber uma resposta iniciada antes da mudança.
+    """
+
+    def __init__(self, name="mcp"):
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight = {}
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, share=None, tag=None):
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self._tags[key] = tag
+            else:
+                self.coalesced += 1
+                call.waiters += 1
+
+        if not leader:
+            instrumentation.inc("mcp_coalesced_requests_total", group=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            try:
+                result = fn()
+            finally:
+                # A partir daqui ninguém mais entra na chamada; `waiters` não muda
+                self._release(key, call)
+            if share is not None and call.waiters:
+                result = share(result)
+            call.result = result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.done.set()
+        return call.result
+
+    def _release(self, key, call):
+        # A chave pode já ter sido liberada por forget (e ocupada por outra chamada)
+        with self._lock:
+            if self._inflight.get(key) is call:
+                del self._inflight[key]
+                del self._tags[key]
+
+    def forget(self, match):
+        """Desliga as chamadas em andamento cuja tag satisfaz `match`; retorna quantas."""
+        with self._lock:
+            keys = [key for key, tag in self._tags.items() if tag is not None and match(tag)]
+            for key in keys:
+                del self._inflight[key]
+                del self._tags[key]
+        if keys:
+            instrumentation.inc("mcp_forgotten_flights_total", len(keys), group=self.name)
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+            }
+
+
+class AsyncSingleFlight(SingleFlight):
+    """Versão para asyncio do SingleFlight (várias sessões em um mesmo event loop)."""
+
+    async def do(self, key, fn, tag=None):
+        import asyncio
+
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = asyncio.get_running_loop().create_future()
+                self._tags[key] = tag
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            instrumentation.inc("mcp_coalesced_requests_total", group=self.name)
+            # shield: o cancelamento de quem espera não cancela a chamada compartilhada
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita o aviso de exceção não recuperada quando ninguém mais aguarda
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(key, future)
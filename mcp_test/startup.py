@@ -0,0 +1,90 @@
+import importlib
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# Referência de tempo: início da importação do assistente
+STARTED_AT = time.perf_counter()
+
+
+class StartupProfile:
+    """Duração de cada etapa da inicialização (importações, health check, assistant...)."""
+
+    def __init__(self, started_at=STARTED_AT):
+        self.started_at = started_at
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark(self, name):
+        """Registra o tempo decorrido desde o início da importação (ex.: até o prompt)."""
+        self.record(name, time.perf_counter() - self.started_at)
+
+    def report(self):
+        with self._lock:
+            phases = dict(self.phases)
+        lines = ["\n=== Perfil de inicialização ==="]
+        for name, seconds in phases.items():
+            lines.append(f"{name:<36}{seconds * 1000:>10.1f} ms")
+        return "\n".join(lines)
+
+
+profile = StartupProfile()
+
+
+class LazyModule:
+    """Módulo importado apenas no primeiro acesso a um de seus atributos.
+
+    Bibliotecas pesadas (como openai) deixam de atrasar a exibição do prompt;
+    o tempo da importação é registrado no perfil de inicialização.
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    profile.record(f"import {self._name}", time.perf_counter() - start)
+                    object.__setattr__(self, "_module", module)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+
+def in_background(fn, name, *args):
+    """Executa `fn` em uma thread daemon (não impede o encerramento) e retorna um Future."""
+    future = Future()
+
+    def run():
+        try:
+            with profile.phase(name):
+                result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, name=f"startup-{name}", daemon=True).start()
+    return future
@@ -0,0 +1,141 @@
+import codecs
+import json
+import os
+
+# Tamanho (bytes) dos blocos lidos da resposta
+CHUNK_SIZE = int(os.getenv("MCP_STREAM_CHUNK_SIZE", "65536"))
+
+# Respostas acima deste tamanho (Content-Length) são lidas em streaming; sem Content-Length, sempre
+DEFAULT_MIN_BYTES = int(os.getenv("MCP_STREAM_MIN_BYTES", "1048576"))
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+def should_stream(response, min_bytes=DEFAULT_MIN_BYTES):
+    """Se a resposta (aberta com stream=True) é grande o bastante para ser lida em streaming."""
+    length = response.headers.get("Content-Length")
+    if length is None or not length.isdigit():
+        return True
+    return int(length) > min_bytes
+
+
+class ItemStream:
+    """Lê um documento {"items": [...], ...} em blocos, entregando um item por vez.
+
+    Iterar sobre o objeto retorna os itens da lista `items` à medida que chegam,
+    sem montar o documento inteiro nem guardar a resposta bruta na memória: só
+    o bloco atual e o item em leitura ficam no buffer. As demais chaves do
+    objeto (ex.: error) ficam em `extra` quando a iteração termina. Pode ser
+    iterado uma única vez.
+    """
+
+    def __init__(self, chunks, key="items", on_close=None):
+        self.key = key
+        self.extra = {}
+        self.found = False
+        self.bytes_read = 0
+        self.items_read = 0
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._started = False
+        self._on_close = on_close
+
+    @classmethod
+    def from_response(cls, response, chunk_size=CHUNK_SIZE):
+        """Lê o corpo de uma resposta do requests aberta com stream=True."""
+        return cls(response.iter_content(chunk_size), on_close=response.close)
+
+    def _fill(self):
+        # Lê o próximo bloco, descartando do buffer o que já foi processado; False no fim
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+            self._pos = 0
+            return False
+        self.bytes_read += len(chunk)
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        # Próximo caractere não branco (sem consumi-lo), ou "" no fim do documento
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSON inválido na posição {self.bytes_read}: esperado um de {chars!r}, "
+                             f"encontrado {char or 'fim do documento'!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Valor incompleto: ler mais um bloco (no fim do documento, o erro é real)
+                if not self._fill():
+                    raise
+                continue
+            # Um número no fim do buffer pode continuar no próximo bloco
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError("ItemStream só pode ser iterado uma vez")
+        self._started = True
+        try:
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == self.key and self._peek() == "[":
+                    self.found = True
+                    self._pos += 1
+                    if self._peek() == "]":
+                        self._pos += 1
+                    else:
+                        while True:
+                            item = self._value()
+                            self.items_read += 1
+                            yield item
+                            if self._expect(",]") == "]":
+                                break
+                else:
+                    self.extra[key] = self._value()
+                if self._expect(",}") == "}":
+                    break
+        finally:
+            self.close()
+
+    def close(self):
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+    def to_response(self):
+        """Lê todo o documento e o retorna como dicionário (quando a lista inteira é necessária)."""
+        items = list(self)
+        if not self.found:
+            return self.extra
+        return {self.key: items, **self.extra}
@@ -0,0 +1,119 @@
+import json
+
+# Formatos aceitos no parâmetro outputFormat de getKubernetesResources
+OUTPUT_FORMATS = ("json", "table")
+
+# Colunas com até esta fração de valores distintos viram dicionários (valor -> índice)
+DICTIONARY_RATIO = 0.5
+
+_NOTE = "cada linha de rows segue a ordem de columns; nas colunas de dictionaries, o valor é o índice na lista"
+
+
+def _flatten(value, prefix, row):
+    # Dicionários viram colunas com caminho por pontos; listas, escalares e dicionários
+    # com pontos nas chaves (ex.: labels kubernetes.io/hostname) são valores
+    if isinstance(value, dict) and value and not any("." in key for key in value):
+        for key, child in value.items():
+            _flatten(child, f"{prefix}.{key}" if prefix else key, row)
+    else:
+        row[prefix] = value
+
+
+def _key(value):
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else (type(value).__name__, value)
+
+
+def encode_table(items):
+    """Codifica uma lista de objetos como tabela: colunas, linhas e dicionários de valores repetidos.
+
+    Cada caminho (ex.: status.phase) aparece uma única vez em `columns`, em vez
+    de repetir as chaves em todos os itens. Colunas com poucos valores
+    distintos (namespace, fase, node, condições) são guardadas uma vez em
+    `dictionaries` e as linhas trazem apenas o índice.
+    """
+    flat_items = []
+    columns = {}
+    for item in items:
+        row = {}
+        _flatten(item, "", row)
+        flat_items.append(row)
+        for column in row:
+            columns.setdefault(column, None)
+    columns = list(columns)
+
+    # Índice de cada valor distinto, apenas nas colunas em que compensa
+    indexes = {}
+    dictionaries = {}
+    for column in columns:
+        index = {}
+        values = []
+        present = 0
+        for row in flat_items:
+            if column in row:
+                present += 1
+                key = _key(row[column])
+                if key not in index:
+                    index[key] = len(values)
+                    values.append(row[column])
+        if present > 1 and len(values) <= present * DICTIONARY_RATIO:
+            indexes[column] = index
+            dictionaries[column] = values
+
+    rows = []
+    for flat in flat_items:
+        row = []
+        for column in columns:
+            value = flat.get(column)
+            if column in indexes and column in flat:
+                value = indexes[column][_key(value)]
+            row.append(value)
+        rows.append(row)
+
+    return {
+        "format": "table",
+        "note": _NOTE,
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "rows": rows,
+    }
+
+
+def decode_table(table):
+    """Reconstrói a lista de objetos a partir de `encode_table` (campos ausentes ficam de fora)."""
+    items = []
+    dictionaries = table.get("dictionaries", {})
+    for row in table["rows"]:
+        item = {}
+        for column, value in zip(table["columns"], row):
+            if value is None:
+                continue
+            if column in dictionaries:
+                value = dictionaries[column][value]
+            target = item
+            parts = column.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        items.append(item)
+    return items
+
+
+def encode_response(response):
+    """Substitui `items` de uma resposta de tools/get pela codificação em tabela."""
+    if not isinstance(response, dict) or not isinstance(response.get("items"), list):
+        return response
+    encoded = {key: value for key, value in response.items() if key != "items"}
+    encoded["items"] = encode_table(response["items"])
+    return encoded
+
+
+def compact_dumps(value):
+    """JSON sem espaços nem escapes de não-ASCII (a mesma serialização nos dois formatos)."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps(response, output_format="json"):
+    """Serializa a saída de uma ferramenta no formato pedido (json ou table)."""
+    if output_format == "table":
+        return compact_dumps(encode_response(response))
+    return compact_dumps(response)
@@ -1,7 +1,7 @@
-import requests
 import json
 import os
 from dotenv import load_dotenv
+from mcp_client import get_client
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -12,7 +12,7 @@ MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:3333")
 def test_connection():
     """Testa a conexão com o MCP Server."""
     try:
-        response = requests.get(f"{MCP_SERVER_URL}/v1/health")
+        response = get_client(MCP_SERVER_URL).health()
         if response.status_code == 200:
             print("Conexão com o MCP Server estabelecida com sucesso!")
             return True
@@ -25,14 +25,13 @@ def test_connection():
 
 def get_kubernetes_resources(resource_type, namespace="default"):
     """Obtém recursos Kubernetes do cluster."""
-    url = f"{MCP_SERVER_URL}/v1/tools/get"
     payload = {
         "resourceType": resource_type,
         "namespace": namespace
     }
     
     try:
-        response = requests.post(url, json=payload)
+        response = get_client(MCP_SERVER_URL).post("tools/get", payload)
         if response.status_code == 200:
             print(f"Recursos obtidos com sucesso:")
             print(json.dumps(response.json(), indent=2))
@@ -47,13 +46,12 @@ def get_kubernetes_resources(resource_type, namespace="default"):
 
 def apply_kubernetes_config(config_yaml):
     """Aplica uma configuração YAML no cluster Kubernetes."""
-    url = f"{MCP_SERVER_URL}/v1/tools/apply"
     payload = {
         "config": config_yaml
     }
     
     try:
-        response = requests.post(url, json=payload)
+        response = get_client(MCP_SERVER_URL).post("tools/apply", payload)
         if response.status_code == 200:
             print("Configuração aplicada com sucesso!")
             print(json.dumps(response.json(), indent=2))
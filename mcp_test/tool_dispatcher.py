@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+
+# Número máximo de chamadas de ferramenta executadas em paralelo
+MAX_CONCURRENCY = int(os.getenv("MCP_MAX_CONCURRENCY", "8"))
+
+# Um lock por objeto (kind, namespace, name): applies no mesmo objeto são serializados
+_object_locks = {}
+_async_object_locks = {}
+_object_locks_guard = threading.Lock()
+
+
+def object_lock(key):
+    """Lock do objeto `key` (kind, namespace, name), usado em volta de cada apply individual."""
+    with _object_locks_guard:
+        lock = _object_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _object_locks[key] = lock
+        return lock
+
+
+def async_object_lock(key):
+    """Equivalente de object_lock para o motor asyncio (um asyncio.Lock por objeto)."""
+    with _object_locks_guard:
+        lock = _async_object_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            _async_object_locks[key] = lock
+        return lock
+
+
+def error_output(function_name, error):
+    """Saída enviada ao modelo quando uma chamada de ferramenta falha."""
+    instrumentation.inc("tool_call_errors_total", tool=function_name)
+    return json.dumps({"error": f"Falha ao executar {function_name}: {error}"})
+
+
+def _record(function_name, result):
+    instrumentation.inc("tool_calls_total", tool=function_name)
+    instrumentation.observe("tool_output_bytes", len(result or ""), tool=function_name)
+
+
+def _run_one(tool_call, handler, parent=None):
+    function_name = tool_call.function.name
+
+    # O span pai vem da thread que despachou as chamadas
+    with instrumentation.span("tool_call", parent=parent, tool=function_name, tool_call_id=tool_call.id) as span:
+        # Uma chamada com erro não derruba as demais: o modelo recebe o erro como saída
+        try:
+            result = handler(function_name, json.loads(tool_call.function.arguments))
+        except Exception as e:
+            span.set("error", repr(e))
+            result = error_output(function_name, e)
+
+    _record(function_name, result)
+    return result
+
+
+async def _run_one_async(tool_call, handler):
+    function_name = tool_call.function.name
+    # Sem span: a pilha de spans do tracer é por thread, e as corrotinas compartilham a mesma
+    try:
+        result = await handler(function_name, json.loads(tool_call.function.arguments))
+    except Exception as e:
+        result = error_output(function_name, e)
+    _record(function_name, result)
+    return result
+
+
+def dispatch_tool_calls(tool_calls, handler, max_concurrency=None):
+    """Executa as chamadas de ferramenta em paralelo e retorna os tool_outputs.
+
+    `handler(function_name, args)` deve retornar a saída (string) de uma chamada.
+    A lista retornada mantém a mesma ordem de `tool_calls`.
+    """
+    tool_calls = list(tool_calls)
+    workers = max(1, min(max_concurrency or MAX_CONCURRENCY, len(tool_calls) or 1))
+
+    parent = instrumentation.tracer.current()
+    if workers == 1:
+        results = [_run_one(tool_call, handler, parent) for tool_call in tool_calls]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda tool_call: _run_one(tool_call, handler, parent), tool_calls))
+
+    return [
+        {"tool_call_id": tool_call.id, "output": result}
+        for tool_call, result in zip(tool_calls, results)
+    ]
+
+
+async def dispatch_tool_calls_async(tool_calls, handler):
+    """Versão asyncio de dispatch_tool_calls, em que `handler` é uma corrotina.
+
+    Uma chamada com erro (inclusive argumentos inválidos) vira uma saída de
+    erro só para o seu tool_call_id, sem cancelar as demais.
+    """
+    tool_calls = list(tool_calls)
+    results = await asyncio.gather(*[_run_one_async(tool_call, handler) for tool_call in tool_calls])
+    return [
+        {"tool_call_id": tool_call.id, "output": result}
+        for tool_call, result in zip(tool_calls, results)
+    ]
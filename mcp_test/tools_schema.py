@@ -0,0 +1,117 @@
+# Definição única das ferramentas do assistente, compartilhada por
+# k8s_assistant.py e create_assistant.py
+
+# Modelo usado pelos assistants
+ASSISTANT_MODEL = "gpt-4o"
+
+KUBERNETES_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "applyKubernetesConfig",
+            "description": "Aplica uma configuração YAML no cluster Kubernetes",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "config": {
+                        "type": "string",
+                        "description": "YAML ou JSON contendo a configuração Kubernetes a ser aplicada"
+                    },
+                    "force": {
+                        "type": "boolean",
+                        "description": "Reaplicar mesmo que a configuração seja idêntica à última aplicada (padrão: false)"
+                    }
+                },
+                "required": ["config"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "getKubernetesResources",
+            "description": "Obtém recursos Kubernetes do cluster",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "resourceType": {
+                        "type": "string",
+                        "description": "Tipo de recurso Kubernetes (pods, deployments, services, etc.)"
+                    },
+                    "namespace": {
+                        "type": "string",
+                        "description": "Namespace dos recursos (padrão: default)"
+                    },
+                    "labelSelector": {
+                        "type": "string",
+                        "description": "Filtro por labels, ex.: app=nginx,tier!=db"
+                    },
+                    "fieldSelector": {
+                        "type": "string",
+                        "description": "Filtro por campos, ex.: status.phase!=Running"
+                    },
+                    "fields": {
+                        "type": "string",
+                        "description": "Campos a retornar separados por vírgula, ex.: metadata.name,status.phase (padrão: campos principais do tipo)"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Posição inicial quando a resposta anterior veio paginada (nextOffset)"
+                    },
+                    "outputFormat": {
+                        "type": "string",
+                        "enum": ["json", "table"],
+                        "description": "Formato da saída: json (objetos) ou table (colunas + linhas, mais compacto para listas grandes)"
+                    }
+                },
+                "required": ["resourceType"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "aggregateKubernetesResources",
+            "description": (
+                "Conta e agrupa recursos Kubernetes localmente (por namespace, fase, node ou outro campo) "
+                "e calcula a prontidão de deployments/pods; use para perguntas de contagem ou resumo "
+                "em vez de listar todos os recursos"
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "resourceType": {
+                        "type": "string",
+                        "description": "Tipo de recurso Kubernetes (pods, deployments, services, etc.)"
+                    },
+                    "namespace": {
+                        "type": "string",
+                        "description": "Namespace dos recursos (padrão: all, todos os namespaces)"
+                    },
+                    "groupBy": {
+                        "type": "string",
+                        "description": "Campos de agrupamento separados por vírgula: namespace, phase, node, type ou um caminho como metadata.labels.app"
+                    },
+                    "metric": {
+                        "type": "string",
+                        "enum": ["count", "readiness"],
+                        "description": "count (padrão) ou readiness (réplicas prontas/desejadas e os itens menos prontos)"
+                    },
+                    "topN": {
+                        "type": "integer",
+                        "description": "Número máximo de grupos (e de itens menos prontos) retornados (padrão: 10)"
+                    },
+                    "labelSelector": {
+                        "type": "string",
+                        "description": "Filtro por labels, ex.: app=nginx,tier!=db"
+                    },
+                    "fieldSelector": {
+                        "type": "string",
+                        "description": "Filtro por campos, ex.: status.phase!=Running"
+                    }
+                },
+                "required": ["resourceType"]
+            }
+        }
+    }
+]
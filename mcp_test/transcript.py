@@ -0,0 +1,105 @@
+import threading
+
+# Tamanho da página ao buscar mensagens novas
+PAGE_SIZE = 100
+
+
+def message_text(message):
+    """Texto de uma mensagem, juntando todas as partes do conteúdo."""
+    parts = []
+    for part in message.content or []:
+        if part.type == "text":
+            parts.append(part.text.value)
+        elif part.type == "image_file":
+            parts.append(f"[imagem: {part.image_file.file_id}]")
+        elif part.type == "image_url":
+            parts.append(f"[imagem: {part.image_url.url}]")
+        elif part.type == "refusal":
+            parts.append(part.refusal)
+    return "\n".join(parts)
+
+
+class Transcript:
+    """Cópia local das mensagens de uma thread, atualizada de forma incremental.
+
+    Guarda o ID da última mensagem vista e busca apenas as mensagens mais
+    novas (opcionalmente só as de um run), em vez de listar a thread inteira
+    a cada turno.
+    """
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.messages = []
+        self.last_message_id = None
+        self.tool_output_bytes = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def record(self, message):
+        """Adiciona uma mensagem já conhecida (criada localmente ou recebida por streaming)."""
+        with self._lock:
+            if message.id in self._seen:
+                return None
+            entry = {
+                "id": message.id,
+                "role": message.role,
+                "run_id": getattr(message, "run_id", None),
+                "text": message_text(message),
+            }
+            self._seen.add(message.id)
+            self.messages.append(entry)
+            self.last_message_id = message.id
+            return entry
+
+    def fetch_new(self, threads_api, run_id=None):
+        """Busca as mensagens posteriores à última vista e retorna as novas entradas.
+
+        Com `run_id`, a listagem é filtrada pelo run (que só contém mensagens
+        novas); sem ele, parte do ID da última mensagem vista.
+        """
+        new_entries = []
+        cursor = None if run_id else self.last_message_id
+        while True:
+            params = {"thread_id": self.thread_id, "order": "asc", "limit": PAGE_SIZE}
+            if cursor:
+                params["after"] = cursor
+            if run_id:
+                params["run_id"] = run_id
+            page = threads_api.messages.list(**params)
+
+            for message in page.data:
+                entry = self.record(message)
+                if entry:
+                    new_entries.append(entry)
+            if not page.data or not getattr(page, "has_more", False):
+                return new_entries
+            cursor = page.data[-1].id
+
+    def record_tool_outputs(self, tool_outputs):
+        """Contabiliza as saídas de ferramentas enviadas (elas também ocupam o contexto da thread)."""
+        with self._lock:
+            self.tool_output_bytes += sum(len(output["output"].encode("utf-8")) for output in tool_outputs)
+
+    def context_size(self):
+        """Tamanho aproximado (bytes) do contexto da thread: mensagens e saídas de ferramentas."""
+        with self._lock:
+            return self.tool_output_bytes + sum(len(entry["text"].encode("utf-8")) for entry in self.messages)
+
+
+# Transcrições por thread
+_transcripts = {}
+_transcripts_lock = threading.Lock()
+
+
+def get_transcript(thread_id):
+    with _transcripts_lock:
+        transcript = _transcripts.get(thread_id)
+        if transcript is None:
+            transcript = _transcripts[thread_id] = Transcript(thread_id)
+        return transcript
+
+
+def clear_transcripts():
+    """Descarta as transcrições locais (ex.: ao reproduzir a mesma gravação novamente)."""
+    with _transcripts_lock:
+        _transcripts.clear()